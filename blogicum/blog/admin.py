@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from blog.models import Category, Comment, Location, Post
+from blog.models import Category, Comment, Job, Location, Post
 
 
 @admin.register(Category)
@@ -27,5 +27,19 @@ class CommentsAdmin(admin.ModelAdmin):
 
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
-    list_display = ("title", "is_published", "category", "location", "author")
+    list_display = (
+        "title",
+        "is_published",
+        "category",
+        "location",
+        "author",
+        "comment_count",
+    )
     list_editable = ("is_published",)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("kind", "payload", "status", "attempts", "run_after")
+    list_filter = ("status", "kind")
+    readonly_fields = ("last_error",)
@@ -0,0 +1,179 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.template.loader import render_to_string
+
+from blog.constants import POST_CARD_CACHE_TIMEOUT
+from blog.routers import read_from_replica
+
+POST_CARD_TEMPLATE = "includes/post_card.html"
+FEED_VERSION = ("feed", "all")
+PAGE_RENDERED = "rendered"
+
+PROCESS_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+)
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def cache_is_shared(alias="default"):
+    """Whether a stamp bumped here reaches the other processes."""
+    return settings.CACHES[alias]["BACKEND"] not in PROCESS_LOCAL_CACHES
+
+
+def version_key(kind, pk):
+    return f"blog:version:{kind}:{pk}"
+
+
+def new_stamp():
+    """A unique version stamp that also records when it was made."""
+    return f"{time.time():.6f}-{uuid.uuid4().hex}"
+
+
+def stamp_time(stamp):
+    return float(stamp.partition("-")[0])
+
+
+def _set_versions(kind, pks):
+    cache.set_many({version_key(kind, pk): new_stamp() for pk in pks}, None)
+
+
+def bump_versions(kind, pks):
+    """Invalidate every cached fragment and page that depends on the objects.
+
+    The stamps are changed right away and once more after commit, so a
+    reader that caches pre-commit data under the first stamp is evicted.
+    """
+    pks = list(pks)
+    if not pks:
+        return
+    _set_versions(kind, pks)
+    transaction.on_commit(lambda: _set_versions(kind, pks))
+
+
+def bump_version(kind, pk):
+    bump_versions(kind, [pk])
+
+
+def _count(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def cache_stats():
+    with _stats_lock:
+        return {
+            event: _stats[event]
+            for event in (
+                "post_card_hits",
+                "post_card_misses",
+                "page_hits",
+                "page_misses",
+            )
+        }
+
+
+def get_stamped(key, dependencies):
+    """Fetch a cached value and the current stamps of its dependencies.
+
+    Missing stamps are set without checking for a racing writer: every
+    stamp is unique, so overwriting another one only costs a cache miss.
+    """
+    version_keys = [version_key(kind, pk) for kind, pk in dependencies]
+    found = cache.get_many([key, *version_keys])
+    missing = {
+        dependency_key: new_stamp()
+        for dependency_key in version_keys
+        if dependency_key not in found
+    }
+    if missing:
+        cache.set_many(missing, None)
+        found.update(missing)
+    stamp = [found[dependency_key] for dependency_key in version_keys]
+    cached = found.get(key)
+    if cached is not None and cached[0] == stamp:
+        return stamp, cached[1]
+    return stamp, None
+
+
+def set_stamped(key, stamp, value, timeout):
+    cache.set(key, (stamp, value), timeout)
+
+
+def post_card_dependencies(post):
+    return [
+        (kind, pk)
+        for kind, pk in (
+            ("post", post.pk),
+            ("category", post.category_id),
+            ("location", post.location_id),
+            ("user", post.author_id),
+        )
+        if pk is not None
+    ]
+
+
+def render_post_card(post):
+    fragment_key = f"blog:post_card:{post.pk}"
+    if post.image_variants.get("pending"):
+        # run_jobs may finish the variants where its stamp bump is not
+        # seen, so a placeholder card is never reused for the ready row.
+        fragment_key += ":pending"
+    stamp, html = get_stamped(fragment_key, post_card_dependencies(post))
+    if html is not None:
+        _count("post_card_hits")
+        return html
+    _count("post_card_misses")
+    html = render_to_string(POST_CARD_TEMPLATE, {"post": post})
+    if not read_from_replica(post):
+        set_stamped(fragment_key, stamp, html, POST_CARD_CACHE_TIMEOUT)
+    return html
+
+
+def page_validators(stamp, changed_at=None):
+    """Return the ETag and Last-Modified timestamp of a page.
+
+    A stamp first seen by the cache counts as changed at that moment, so
+    a cold cache only ever makes pages look newer than they are.
+    """
+    last_changed = max(
+        [stamp_time(part) for part in stamp]
+        + ([changed_at] if changed_at is not None else [])
+    )
+    digest = hashlib.md5(
+        "|".join([*stamp, repr(last_changed)]).encode()
+    ).hexdigest()
+    return f'"{digest}"', int(last_changed)
+
+
+def page_cache_key(request):
+    digest = hashlib.md5(request.get_full_path().encode()).hexdigest()
+    return f"blog:page:{digest}"
+
+
+def get_cached_page(key, dependencies):
+    """Stamp, cached response and whether the page rendered under the stamp.
+
+    A page that could not be stored (it set a cookie) still leaves a
+    marker, so conditional requests for it can be answered from the cache.
+    """
+    stamp, cached = get_stamped(key, dependencies)
+    response = None if cached == PAGE_RENDERED else cached
+    _count("page_hits" if response is not None else "page_misses")
+    return stamp, response, cached is not None
+
+
+def set_cached_page(key, stamp, response, timeout):
+    set_stamped(key, stamp, response, timeout)
+
+
+def mark_page_rendered(key, stamp, timeout):
+    set_stamped(key, stamp, PAGE_RENDERED, timeout)
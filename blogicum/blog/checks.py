@@ -0,0 +1,21 @@
+from django.core.checks import Tags, Warning, register
+
+from blog.caching import cache_is_shared
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    if cache_is_shared():
+        return []
+    return [
+        Warning(
+            "Кэш по умолчанию виден только своему процессу: изменения,"
+            " сделанные в других процессах, не сбросят кэш карточек и"
+            " страниц.",
+            hint=(
+                "Укажите в CACHES общий для всех процессов бэкенд:"
+                " memcached или FileBasedCache."
+            ),
+            id="blog.W001",
+        )
+    ]
@@ -0,0 +1,52 @@
+import os
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def _count(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def connection_stats():
+    """Connection counters of the current worker process."""
+    with _stats_lock:
+        return {
+            "pid": os.getpid(),
+            "opened": _stats["opened"],
+            "reused": _stats["reused"],
+            "discarded": _stats["discarded"],
+        }
+
+
+@receiver(connection_created)
+def count_opened(sender, connection, **kwargs):
+    _count("opened")
+
+
+def check_persistent_connections(wrappers, health_checks=True):
+    """Discard broken persistent connections before a request reuses them."""
+    for wrapper in wrappers:
+        if wrapper.connection is None or wrapper.in_atomic_block:
+            continue
+        if health_checks and not wrapper.is_usable():
+            wrapper.close()
+            _count("discarded")
+        else:
+            _count("reused")
+
+
+@receiver(request_started)
+def check_connections_on_request(sender, **kwargs):
+    check_persistent_connections(
+        connections.all(), health_checks=settings.DB_HEALTH_CHECKS
+    )
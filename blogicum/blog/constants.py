@@ -1,3 +1,14 @@
 MAX_LENGTH = 256
 POST_LIST_LIMIT = 10
 TEXT_LIMIT = 30
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+PAGE_CACHE_TIMEOUT = 60 * 5
+COMMENT_LIST_LIMIT = 50
+TIMING_SAMPLES = 1000
+IMAGE_VARIANT_WIDTHS = (320, 640, 960, 1280)
+IMAGE_VARIANT_FORMATS = ("webp", "jpeg")
+IMAGE_VARIANT_QUALITY = 80
+POST_IMAGE_SIZES = "(max-width: 40rem) 100vw, 40rem"
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 30
+JOB_LOCK_TIMEOUT = 60 * 10
@@ -0,0 +1,140 @@
+import logging
+import os
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from blog.caching import FEED_VERSION, bump_version
+from blog.constants import (IMAGE_VARIANT_FORMATS, IMAGE_VARIANT_QUALITY,
+                            IMAGE_VARIANT_WIDTHS)
+from blog.jobs import enqueue, job_handler
+from blog.models import Post
+
+EXTENSIONS = {"webp": "webp", "jpeg": "jpg"}
+
+logger = logging.getLogger(__name__)
+
+
+def variant_name(name, width, image_format):
+    stem, _ = os.path.splitext(name)
+    return f"{stem}__w{width}.{EXTENSIONS[image_format]}"
+
+
+def variant_widths(original_width):
+    """Configured widths below the original, plus one no wider than it."""
+    widths = {
+        width for width in IMAGE_VARIANT_WIDTHS if width < original_width
+    }
+    widths.add(min(original_width, max(IMAGE_VARIANT_WIDTHS)))
+    return sorted(widths)
+
+
+def encode(image, image_format):
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        format=image_format.upper(),
+        quality=IMAGE_VARIANT_QUALITY,
+        optimize=True,
+    )
+    return buffer.getvalue()
+
+
+def build_variants(field_file):
+    """Save resized WebP and JPEG copies of the image to its storage.
+
+    Returns the description kept in Post.image_variants.
+    """
+    storage = field_file.storage
+    with storage.open(field_file.name, "rb") as source:
+        image = ImageOps.exif_transpose(Image.open(source)).convert("RGB")
+    variants = []
+    for width in variant_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image
+        if width != image.width:
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for image_format in IMAGE_VARIANT_FORMATS:
+            name = storage.save(
+                variant_name(field_file.name, width, image_format),
+                ContentFile(encode(resized, image_format)),
+            )
+            variants.append({
+                "format": image_format,
+                "width": width,
+                "height": height,
+                "name": name,
+            })
+    return {
+        "source": field_file.name,
+        "width": image.width,
+        "height": image.height,
+        "variants": variants,
+    }
+
+
+def variants_stale(post):
+    return post.image_variants.get("source") != (post.image.name or None)
+
+
+def refresh_variants(post):
+    """Regenerate the variants of the post image and store them on the row.
+
+    An unreadable image gets an empty variant list, so pages fall back to
+    the original instead of retrying on every render.
+    """
+    variants = {}
+    if post.image:
+        try:
+            variants = build_variants(post.image)
+        except (OSError, Image.DecompressionBombError):
+            logger.exception("Не удалось уменьшить фото %s", post.image.name)
+            variants = {"source": post.image.name, "variants": []}
+    post.image_variants = variants
+    Post.objects.filter(pk=post.pk).update(image_variants=variants)
+    bump_version("post", post.pk)
+    bump_version(*FEED_VERSION)
+
+
+def queue_variants(post):
+    """Mark the post image as processing and queue its variants.
+
+    The original's size is read from the file header, so the placeholder
+    shown meanwhile keeps the final aspect ratio.
+    """
+    variants = {}
+    if post.image:
+        variants = {"source": post.image.name, "pending": True}
+        try:
+            variants.update(width=post.image.width, height=post.image.height)
+        except (OSError, TypeError):
+            pass
+        enqueue("image_variants", post_id=post.pk)
+    post.image_variants = variants
+    Post.objects.filter(pk=post.pk).update(image_variants=variants)
+
+
+def queue_stale_variants():
+    """Queue variants for images saved before variants existed.
+
+    Pages only read image_variants, so old photos are shown in full size
+    until this runs. Returns the number of queued posts.
+    """
+    stale = [
+        pk
+        for pk, image, variants in Post.objects.exclude(image="")
+        .values_list("pk", "image", "image_variants")
+        .iterator()
+        if variants.get("source") != image
+    ]
+    for post in Post.objects.filter(pk__in=stale):
+        queue_variants(post)
+    return len(stale)
+
+
+@job_handler("image_variants")
+def generate_post_variants(post_id):
+    post = Post.objects.filter(pk=post_id).first()
+    if post is not None and post.image_variants.get("pending"):
+        refresh_variants(post)
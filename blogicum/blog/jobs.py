@@ -0,0 +1,83 @@
+import traceback
+from datetime import timedelta
+
+from django.db.models import F
+from django.utils import timezone
+
+from blog.constants import JOB_LOCK_TIMEOUT, JOB_MAX_ATTEMPTS, JOB_RETRY_DELAY
+from blog.models import Job
+
+_handlers = {}
+
+
+def job_handler(kind):
+    """Register a function as the handler of jobs of this kind."""
+    def register(function):
+        _handlers[kind] = function
+        return function
+    return register
+
+
+def enqueue(kind, **payload):
+    """Queue a job unless an identical one is already waiting.
+
+    Called inside the caller's transaction, so a job for a rolled back
+    write is never seen by the worker.
+    """
+    if not Job.objects.filter(
+        kind=kind, payload=payload, status=Job.PENDING
+    ).exists():
+        Job.objects.create(kind=kind, payload=payload)
+
+
+def claim_jobs(limit, token):
+    """Lock up to `limit` due jobs for this worker and return them.
+
+    Jobs locked by a worker that died are released after JOB_LOCK_TIMEOUT.
+    """
+    now = timezone.now()
+    Job.objects.filter(
+        status=Job.RUNNING,
+        locked_at__lt=now - timedelta(seconds=JOB_LOCK_TIMEOUT),
+    ).update(status=Job.PENDING, locked_by="")
+    due = list(
+        Job.objects.filter(status=Job.PENDING, run_after__lte=now)
+        .order_by("run_after", "id")
+        .values_list("pk", flat=True)[:limit]
+    )
+    Job.objects.filter(pk__in=due, status=Job.PENDING).update(
+        status=Job.RUNNING,
+        locked_by=token,
+        locked_at=now,
+        attempts=F("attempts") + 1,
+    )
+    return list(Job.objects.filter(pk__in=due, locked_by=token))
+
+
+def execute(kind, payload):
+    """Run a job; returns the traceback text on failure, None on success.
+
+    Runs in pool processes, so it returns the error instead of raising it.
+    """
+    try:
+        _handlers[kind](**payload)
+    except Exception:
+        return traceback.format_exc()
+    return None
+
+
+def finish(job, error):
+    """Drop a finished job, or schedule a retry with exponential backoff."""
+    if error is None:
+        job.delete()
+        return
+    job.last_error = error
+    job.locked_by = ""
+    if job.attempts >= JOB_MAX_ATTEMPTS:
+        job.status = Job.FAILED
+    else:
+        job.status = Job.PENDING
+        job.run_after = timezone.now() + timedelta(
+            seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+        )
+    job.save(update_fields=("last_error", "locked_by", "status", "run_after"))
@@ -0,0 +1,69 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.utils import timezone
+
+from blog.caching import FEED_VERSION, bump_version, bump_versions
+from blog.models import Category, Comment, Location, Post, User
+
+PREFIX = "loadtest"
+
+
+def seed(users, posts, comments, rng):
+    """Create missing load-test rows; rows from earlier runs are reused."""
+    category, _ = Category.objects.get_or_create(
+        slug=PREFIX,
+        defaults={"title": "Нагрузочный тест", "description": PREFIX},
+    )
+    location, _ = Location.objects.get_or_create(name="Нагрузочный тест")
+    existing = User.objects.filter(username__startswith=f"{PREFIX}-").count()
+    User.objects.bulk_create(
+        User(username=f"{PREFIX}-{number}")
+        for number in range(existing, users)
+    )
+    authors = list(
+        User.objects.filter(username__startswith=f"{PREFIX}-").order_by("pk")
+    )
+    now = timezone.now()
+    existing = Post.objects.filter(category=category).count()
+    new_authors = [
+        authors[number % len(authors)] for number in range(existing, posts)
+    ]
+    # A rerun with more users must still give every user a post to edit.
+    with_posts = set(
+        Post.objects.filter(category=category).values_list(
+            "author_id", flat=True
+        )
+    ) | {author.pk for author in new_authors}
+    new_authors += [
+        author for author in authors if author.pk not in with_posts
+    ]
+    Post.objects.bulk_create(
+        Post(
+            title=f"Публикация {number}",
+            text="Текст публикации для нагрузочного теста.",
+            pub_date=now - timedelta(minutes=number),
+            author=author,
+            category=category,
+            location=location,
+        )
+        for number, author in enumerate(new_authors, start=existing)
+    )
+    post_list = list(Post.objects.filter(category=category))
+    existing = Comment.objects.filter(post__category=category).count()
+    added = Counter()
+    new_comments = []
+    for _ in range(existing, comments):
+        post = rng.choice(post_list)
+        added[post.pk] += 1
+        new_comments.append(
+            Comment(text="Комментарий", post=post, author=rng.choice(authors))
+        )
+    Comment.objects.bulk_create(new_comments, batch_size=500)
+    for post in post_list:
+        post.comment_count += added[post.pk]
+    Post.objects.bulk_update(post_list, ["comment_count"], batch_size=500)
+    # bulk_create and bulk_update send no signals.
+    bump_versions("post", [post.pk for post in post_list])
+    bump_version(*FEED_VERSION)
+    return category, location, authors, post_list
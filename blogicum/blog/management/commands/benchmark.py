@@ -0,0 +1,263 @@
+import copy
+import json
+import logging
+import random
+import re
+import statistics
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.template.loader import render_to_string
+from django.test import Client, override_settings
+from django.test.runner import DiscoverRunner
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.caching import POST_CARD_TEMPLATE
+from blog.constants import POST_LIST_LIMIT
+from blog.form import CommentForm, PostForm
+from blog.loadtest_data import seed
+from blog.mixins import PostListMixin
+from blog.template_warmup import warm_templates
+
+TEMPLATE_TIMING_RE = re.compile(r"template;dur=([\d.]+)")
+
+
+def page_urls(post):
+    return {
+        "index": reverse("blog:index"),
+        "category": reverse(
+            "blog:category_posts", args=[post.category.slug]
+        ),
+        "profile": reverse("blog:profile", args=[post.author.username]),
+        "post_detail": reverse("blog:post_detail", args=[post.pk]),
+        "create_post": reverse("blog:create_post"),
+        "edit_post": reverse("blog:edit_post", args=[post.pk]),
+        "edit_profile": reverse("blog:edit_profile"),
+    }
+
+
+def author_client(post, host):
+    client = Client(HTTP_HOST=host)
+    client.force_login(post.author)
+    return client
+
+
+def benchmark_cases(post, host="testserver"):
+    """Hot paths to time, by name; `post` must be visible in the feed.
+
+    Requests are made by the post's author, so the anonymous page cache
+    does not short-circuit the views being measured.
+    """
+    client = author_client(post, host)
+    post_data = {
+        "title": post.title,
+        "text": post.text,
+        "pub_date": timezone.localtime(post.pub_date).strftime(
+            "%Y-%m-%d %H:%M:%S"
+        ),
+        "category": post.category_id,
+        "is_published": "on",
+    }
+    cases = {
+        "queryset.feed": lambda: list(
+            PostListMixin().get_queryset()[:POST_LIST_LIMIT]
+        ),
+        "render.post_card": lambda: render_to_string(
+            POST_CARD_TEMPLATE, {"post": post}
+        ),
+        "form.post": lambda: PostForm(post_data).is_valid(),
+        "form.comment": lambda: CommentForm({"text": "Текст"}).is_valid(),
+        "reverse.post_detail": lambda: reverse(
+            "blog:post_detail", args=[post.pk]
+        ),
+    }
+    urls = {
+        **page_urls(post),
+        "post_comments": reverse("blog:post_comments", args=[post.pk]),
+    }
+    for name, url in urls.items():
+        status = client.get(url).status_code
+        if status != 200:
+            raise RuntimeError(f"{url} вернул {status}, а не 200.")
+        cases[f"request.{name}"] = (lambda url: lambda: client.get(url))(url)
+    return cases
+
+
+def measure(function, repeat, min_time):
+    """Best time of one call in microseconds, like `timeit`.
+
+    The call count is doubled until a run lasts at least `min_time`.
+    """
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            function()
+        best = min(best, time.perf_counter() - start)
+    return round(best / number * 1_000_000, 2)
+
+
+def run_benchmarks(cases, repeat=5, min_time=0.1):
+    return {
+        name: measure(function, repeat, min_time)
+        for name, function in cases.items()
+    }
+
+
+def find_regressions(results, baseline, threshold):
+    """Cases slower than the baseline by more than `threshold` percent."""
+    regressions = {}
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base and value > base * (1 + threshold / 100):
+            regressions[name] = {
+                "baseline_us": base,
+                "current_us": value,
+                "change_percent": round((value / base - 1) * 100, 1),
+            }
+    return regressions
+
+
+def page_render_ms(client, url, samples):
+    """Median template phase of a page, in ms, from Server-Timing.
+
+    The cache is cleared before each request so post cards are rendered
+    rather than served from the fragment cache.
+    """
+    durations = []
+    for _ in range(samples):
+        cache.clear()
+        header = client.get(url)["Server-Timing"]
+        durations.append(float(TEMPLATE_TIMING_RE.search(header)[1]))
+    return round(statistics.median(durations), 2)
+
+
+def compare_template_loaders(post, samples=20, host="testserver"):
+    """Render time of each page without and with the cached loader."""
+    uncached = copy.deepcopy(settings.TEMPLATES)
+    uncached[0]["OPTIONS"]["loaders"] = settings.TEMPLATE_LOADERS
+    results = {page: {} for page in page_urls(post)}
+    for label, templates in (
+        ("uncached", uncached),
+        ("cached", settings.TEMPLATES),
+    ):
+        with override_settings(TEMPLATES=templates):
+            if label == "cached":
+                warm_templates()
+            client = author_client(post, host)
+            for page, url in page_urls(post).items():
+                results[page][f"{label}_ms"] = page_render_ms(
+                    client, url, samples
+                )
+    return results
+
+
+class Command(BaseCommand):
+    help = (
+        "Замеряет время горячих участков кода на отдельной тестовой базе"
+        " и сравнивает его с сохранённым базовым уровнем."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--baseline",
+            default=Path(settings.BASE_DIR) / "benchmark_baseline.json",
+            help="JSON-файл с базовым уровнем.",
+        )
+        parser.add_argument(
+            "--save",
+            action="store_true",
+            help="Записать результаты как новый базовый уровень.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=20,
+            help="Допустимое замедление относительно базового уровня, в %%.",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--min-time",
+            type=float,
+            default=0.1,
+            help="Минимальная длительность одного замера, в секундах.",
+        )
+        parser.add_argument(
+            "--only",
+            default="",
+            help="Запустить только замеры, в имени которых есть строка.",
+        )
+        parser.add_argument(
+            "--templates",
+            action="store_true",
+            help=(
+                "Сравнить время отрисовки страниц без кэширующего загрузчика"
+                " шаблонов и с ним."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["templates"]:
+            results = self.in_test_database(compare_template_loaders)
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        results = self.in_test_database(
+            lambda post: self.measure(post, options)
+        )
+        path = Path(options["baseline"])
+        if options["save"]:
+            path.write_text(json.dumps(results, indent=2, sort_keys=True))
+            self.stdout.write(json.dumps({"results": results}, indent=2))
+            return
+        baseline = json.loads(path.read_text()) if path.exists() else {}
+        regressions = find_regressions(
+            results, baseline, options["threshold"]
+        )
+        self.stdout.write(json.dumps(
+            {"results": results, "regressions": regressions}, indent=2
+        ))
+        if regressions:
+            raise CommandError(
+                f"Замедление больше {options['threshold']}%: "
+                + ", ".join(regressions)
+            )
+
+    def measure(self, post, options):
+        cases = {
+            name: function
+            for name, function in benchmark_cases(post).items()
+            if options["only"] in name
+        }
+        return run_benchmarks(cases, options["repeat"], options["min_time"])
+
+    def in_test_database(self, function):
+        """Call `function` with a post from a fresh, seeded test database."""
+        setup_test_environment()
+        runner = DiscoverRunner(verbosity=0)
+        old_config = runner.setup_databases()
+        request_logger = logging.getLogger("blog.timing")
+        level = request_logger.level
+        request_logger.setLevel(logging.WARNING)
+        try:
+            cache.clear()
+            *_, posts = seed(10, 100, 500, random.Random(0))
+            return function(posts[0])
+        finally:
+            request_logger.setLevel(level)
+            runner.teardown_databases(old_config)
+            teardown_test_environment()
@@ -0,0 +1,102 @@
+from datetime import timedelta
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import Post, StoredFile
+from blog.storage import INCOMING_DIR
+
+
+def live_names():
+    """Names of every file that a post or a reference count still holds."""
+    names = set(
+        StoredFile.objects.filter(references__gt=0).values_list(
+            "name", flat=True
+        )
+    )
+    for image, variants in (
+        Post.objects.exclude(image="")
+        .values_list("image", "image_variants")
+        .iterator()
+    ):
+        names.add(image)
+        names.update(
+            variant["name"] for variant in variants.get("variants", [])
+        )
+    return names
+
+
+def stored_files(root, prefixes):
+    for prefix in prefixes:
+        for path in (root / prefix).rglob("*"):
+            if path.is_file():
+                yield path
+
+
+def remove_empty_parents(path, root):
+    for parent in path.parents:
+        if parent == root:
+            return
+        try:
+            parent.rmdir()
+        except OSError:
+            return
+
+
+class Command(BaseCommand):
+    help = (
+        "Удаляет файлы медиа, на которые не ссылается ни одна публикация:"
+        " старые фото после правок, уменьшенные копии удалённых фото и"
+        " недокачанные загрузки."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Не трогать файлы моложе этого возраста, в часах.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать файлы, которые будут удалены.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["grace_hours"])
+        field = Post._meta.get_field("image")
+        root = Path(field.storage.location)
+        live = live_names()
+        removed = freed = 0
+        # Photos and their variants share the upload_to prefix; the rest
+        # of MEDIA_ROOT belongs to other apps and is never scanned.
+        for path in sorted(
+            stored_files(root, (field.upload_to, INCOMING_DIR))
+        ):
+            name = path.relative_to(root).as_posix()
+            stat = path.stat()
+            if name in live or stat.st_mtime >= cutoff.timestamp():
+                continue
+            self.stdout.write(name)
+            removed += 1
+            freed += stat.st_size
+            if not options["dry_run"]:
+                path.unlink()
+                remove_empty_parents(path, root)
+        if not options["dry_run"]:
+            released = [
+                pk
+                for pk, name in StoredFile.objects.filter(
+                    references__lte=0, updated_at__lt=cutoff
+                ).values_list("pk", "name")
+                if name not in live
+            ]
+            for start in range(0, len(released), 500):
+                StoredFile.objects.filter(
+                    pk__in=released[start:start + 500]
+                ).delete()
+        self.stdout.write(
+            f"Файлов к удалению: {removed}, {freed / 1024 / 1024:.1f} МБ"
+        )
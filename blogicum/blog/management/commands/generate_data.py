@@ -0,0 +1,239 @@
+import json
+import random
+import time
+from datetime import timedelta
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from blog.caching import FEED_VERSION, bump_version
+from blog.models import Category, Comment, Location, Post, User
+
+WORDS = (
+    "город", "утро", "море", "дорога", "лес", "книга", "кофе", "поезд",
+    "осень", "друзья", "горы", "музыка", "вечер", "дождь", "река", "сад",
+)
+PARETO_ALPHA = 1.5
+PARETO_MEAN = PARETO_ALPHA / (PARETO_ALPHA - 1)
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def skewed_index(rng, count, power):
+    """Index in range(count); low indices are picked far more often."""
+    return int(count * rng.random() ** power)
+
+
+def phrase(rng, words):
+    return " ".join(rng.choices(WORDS, k=words)).capitalize()
+
+
+class Generator:
+    def __init__(self, options, stdout):
+        self.options = options
+        self.rng = random.Random(options["random_seed"])
+        self.prefix = options["prefix"]
+        self.batch_size = options["batch_size"]
+        self.now = timezone.now()
+        self.stdout = stdout
+        self.created = {}
+
+    def insert(self, model, objects):
+        created = 0
+        for batch in batched(objects, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            created += len(batch)
+        self.created[model._meta.model_name] = (
+            self.created.get(model._meta.model_name, 0) + created
+        )
+
+    def next_number(self, model, field):
+        return model.objects.filter(
+            **{f"{field}__startswith": f"{self.prefix}-"}
+        ).count()
+
+    def users(self):
+        start = self.next_number(User, "username")
+        self.insert(User, (
+            User(
+                username=f"{self.prefix}-{number}",
+                first_name=phrase(self.rng, 1),
+                password="!",
+            )
+            for number in range(start, start + self.options["users"])
+        ))
+        return list(
+            User.objects.filter(username__startswith=f"{self.prefix}-")
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+    def categories(self):
+        start = self.next_number(Category, "slug")
+        hidden = self.options["unpublished_categories"]
+        self.insert(Category, (
+            Category(
+                title=phrase(self.rng, 2),
+                description=phrase(self.rng, 8),
+                slug=f"{self.prefix}-{number}",
+                is_published=self.rng.random() >= hidden,
+            )
+            for number in range(start, start + self.options["categories"])
+        ))
+        return list(
+            Category.objects.filter(slug__startswith=f"{self.prefix}-")
+            .order_by("pk")
+            .values_list("pk", flat=True)
+        )
+
+    def locations(self):
+        first = Location.objects.order_by("-pk").values_list(
+            "pk", flat=True
+        ).first() or 0
+        self.insert(Location, (
+            Location(
+                name=phrase(self.rng, 1),
+                is_published=self.rng.random() >= 0.1,
+            )
+            for _ in range(self.options["locations"])
+        ))
+        return list(
+            Location.objects.filter(pk__gt=first).values_list("pk", flat=True)
+        )
+
+    def post(self, authors, categories, locations):
+        rng = self.rng
+        if rng.random() < self.options["scheduled"]:
+            pub_date = self.now + timedelta(
+                seconds=rng.uniform(60, 30 * 86400)
+            )
+        else:
+            pub_date = self.now - timedelta(
+                seconds=rng.uniform(0, self.options["days"] * 86400)
+            )
+        # Pareto weights give a few hot posts most of the comments.
+        comments = int(
+            self.options["comments_per_post"]
+            * rng.paretovariate(PARETO_ALPHA)
+            / PARETO_MEAN
+        )
+        return Post(
+            title=phrase(rng, 4),
+            text=phrase(rng, 40),
+            pub_date=pub_date,
+            is_published=rng.random() >= 0.05,
+            author_id=authors[skewed_index(rng, len(authors), 3)],
+            category_id=categories[skewed_index(rng, len(categories), 2)],
+            location_id=(
+                rng.choice(locations)
+                if locations and rng.random() < 0.5
+                else None
+            ),
+            comment_count=comments,
+        )
+
+    def comments(self, posts, authors):
+        for post in posts:
+            for _ in range(post.comment_count):
+                yield Comment(
+                    text=phrase(self.rng, 12),
+                    post_id=post.pk,
+                    author_id=authors[
+                        skewed_index(self.rng, len(authors), 2)
+                    ],
+                )
+
+    def posts(self, authors, categories, locations):
+        """Insert posts batch by batch, each followed by its comments."""
+        last = Post.objects.order_by("-pk").values_list("pk", flat=True)
+        last = last.first() or 0
+        posts = (
+            self.post(authors, categories, locations)
+            for _ in range(self.options["posts"])
+        )
+        done = 0
+        for batch in batched(posts, self.batch_size):
+            with transaction.atomic():
+                Post.objects.bulk_create(batch)
+                # SQLite does not return primary keys from bulk inserts.
+                ids = list(
+                    Post.objects.filter(pk__gt=last)
+                    .order_by("pk")
+                    .values_list("pk", flat=True)
+                )
+                for post, pk in zip(batch, ids):
+                    post.pk = pk
+                last = ids[-1]
+            self.insert(Comment, self.comments(batch, authors))
+            done += len(batch)
+            self.stdout.write(f"Публикаций: {done}/{self.options['posts']}")
+        self.created["post"] = done
+
+
+class Command(BaseCommand):
+    help = (
+        "Создаёт большой синтетический набор пользователей, категорий,"
+        " местоположений, публикаций и комментариев с реалистичным"
+        " перекосом для нагрузочных тестов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1000)
+        parser.add_argument("--categories", type=int, default=50)
+        parser.add_argument("--locations", type=int, default=200)
+        parser.add_argument("--posts", type=int, default=100000)
+        parser.add_argument(
+            "--comments-per-post",
+            type=float,
+            default=5,
+            help="Среднее число комментариев к публикации.",
+        )
+        parser.add_argument(
+            "--scheduled",
+            type=float,
+            default=0.02,
+            help="Доля отложенных публикаций с датой в будущем.",
+        )
+        parser.add_argument(
+            "--unpublished-categories",
+            type=float,
+            default=0.1,
+            help="Доля снятых с публикации категорий.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="За сколько дней в прошлом распределить публикации.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--prefix", default="synthetic")
+        parser.add_argument("--random-seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if min(options["users"], options["categories"]) < 1:
+            raise CommandError(
+                "Нужны хотя бы один пользователь и одна категория."
+            )
+        start = time.perf_counter()
+        generator = Generator(options, self.stdout)
+        authors = generator.users()
+        categories = generator.categories()
+        locations = generator.locations()
+        generator.posts(authors, categories, locations)
+        # bulk_create sends no signals, so cached pages are reset here.
+        bump_version(*FEED_VERSION)
+        seconds = time.perf_counter() - start
+        rows = sum(generator.created.values())
+        self.stdout.write(json.dumps({
+            "created": generator.created,
+            "seconds": round(seconds, 1),
+            "rows_per_second": round(rows / seconds),
+        }, indent=2))
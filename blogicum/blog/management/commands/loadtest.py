@@ -0,0 +1,301 @@
+import json
+import logging
+import queue
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from urllib.error import HTTPError
+from urllib.parse import urlencode
+from urllib.request import HTTPRedirectHandler, Request, build_opener
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.http import HttpRequest
+from django.middleware.csrf import get_token
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from blog.loadtest_data import seed
+from blog.timing import percentile
+
+ROUTES = ("index", "category", "profile", "detail", "comment", "edit")
+DEFAULT_MIX = "index=35,category=15,profile=15,detail=25,comment=5,edit=5"
+QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+logger = logging.getLogger(__name__)
+
+
+def parse_mix(value):
+    mix = {}
+    for part in value.split(","):
+        route, _, weight = part.partition("=")
+        route = route.strip()
+        if route not in ROUTES or not weight.strip().isdigit():
+            raise CommandError(
+                f"Неверный элемент смеси запросов: {part!r}. "
+                f"Ожидается route=вес, route из {', '.join(ROUTES)}."
+            )
+        mix[route] = int(weight)
+    if not sum(mix.values()):
+        raise CommandError("Сумма весов смеси запросов должна быть больше 0.")
+    return mix
+
+
+class Scenario:
+    """Turns a route name into a concrete request for one client."""
+
+    def __init__(self, category, location, authors, posts, user, rng):
+        self.category = category
+        self.location = location
+        self.authors = authors
+        self.posts = posts
+        self.own_posts = [post for post in posts if post.author_id == user.pk]
+        self.rng = rng
+
+    def build(self, route):
+        post = self.rng.choice(self.posts)
+        if route == "index":
+            return "GET", reverse("blog:index"), None
+        if route == "category":
+            return "GET", reverse(
+                "blog:category_posts", args=[self.category.slug]
+            ), None
+        if route == "profile":
+            username = self.rng.choice(self.authors).username
+            return "GET", reverse("blog:profile", args=[username]), None
+        if route == "detail":
+            return "GET", reverse("blog:post_detail", args=[post.pk]), None
+        if route == "comment":
+            return "POST", reverse("blog:add_comment", args=[post.pk]), {
+                "text": "Комментарий нагрузочного теста",
+            }
+        if not self.own_posts:
+            return self.build("detail")
+        post = self.rng.choice(self.own_posts)
+        return "POST", reverse("blog:edit_post", args=[post.pk]), {
+            "title": post.title,
+            "text": f"Правка {self.rng.random()}",
+            "pub_date": timezone.localtime(post.pub_date).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+            "category": self.category.pk,
+            "location": self.location.pk,
+            "is_published": "on",
+        }
+
+
+class InProcessTransport:
+    """Calls the WSGI application through the test client."""
+
+    def __init__(self, user, host):
+        self.anonymous = Client(HTTP_HOST=host)
+        self.user = Client(HTTP_HOST=host)
+        self.user.force_login(user)
+
+    def request(self, method, path, data, login):
+        client = self.user if login else self.anonymous
+        if method == "GET":
+            response = client.get(path)
+        else:
+            response = client.post(path, data)
+        return response.status_code, response.get("Server-Timing", "")
+
+
+class NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpTransport:
+    """Sends requests to a running server that uses the same database."""
+
+    def __init__(self, user, base_url):
+        client = Client()
+        client.force_login(user)
+        session = client.cookies[settings.SESSION_COOKIE_NAME].value
+        csrf_request = HttpRequest()
+        self.csrf_token = get_token(csrf_request)
+        self.cookie = (
+            f"{settings.SESSION_COOKIE_NAME}={session}; "
+            f"{settings.CSRF_COOKIE_NAME}={csrf_request.META['CSRF_COOKIE']}"
+        )
+        self.base_url = base_url.rstrip("/")
+        self.opener = build_opener(NoRedirect)
+
+    def request(self, method, path, data, login):
+        headers = {"Cookie": self.cookie} if login else {}
+        body = None
+        if method == "POST":
+            body = urlencode(
+                {**data, "csrfmiddlewaretoken": self.csrf_token}
+            ).encode()
+            headers["Referer"] = self.base_url + "/"
+        request = Request(self.base_url + path, body, headers, method=method)
+        try:
+            with self.opener.open(request) as response:
+                response.read()
+                return response.status, response.headers["Server-Timing"]
+        except HTTPError as error:
+            return error.code, error.headers["Server-Timing"]
+
+
+def run_worker(transport, scenario, plan, anonymous_share, results):
+    while True:
+        try:
+            route = plan.get_nowait()
+        except queue.Empty:
+            return
+        start = time.perf_counter()
+        try:
+            method, path, data = scenario.build(route)
+            login = (
+                method == "POST" or scenario.rng.random() >= anonymous_share
+            )
+            status, server_timing = transport.request(
+                method, path, data, login
+            )
+        except Exception:
+            logger.exception("Запрос %s нагрузочного теста не выполнен", route)
+            status, server_timing = None, None
+        elapsed = time.perf_counter() - start
+        match = QUERIES_RE.search(server_timing or "")
+        results.append((
+            route, status, elapsed, int(match[1]) if match else None
+        ))
+
+
+def run_in_thread(*args):
+    try:
+        run_worker(*args)
+    finally:
+        connections.close_all()
+
+
+def summarize(results, seconds):
+    by_route = defaultdict(list)
+    for route, *sample in results:
+        by_route[route].append(sample)
+    routes = {}
+    for route, samples in sorted(by_route.items()):
+        latencies = sorted(elapsed * 1000 for _, elapsed, _ in samples)
+        queries = [count for _, _, count in samples if count is not None]
+        routes[route] = {
+            "requests": len(samples),
+            "errors": sum(
+                status is None or status >= 400 for status, _, _ in samples
+            ),
+            "rps": round(len(samples) / seconds, 1),
+            "p50_ms": round(percentile(latencies, 0.5), 2),
+            "p95_ms": round(percentile(latencies, 0.95), 2),
+            "p99_ms": round(percentile(latencies, 0.99), 2),
+            "queries_mean": (
+                round(sum(queries) / len(queries), 2) if queries else None
+            ),
+            "queries_max": max(queries, default=None),
+        }
+    return {
+        "requests": len(results),
+        "seconds": round(seconds, 3),
+        "rps": round(len(results) / seconds, 1),
+        "routes": routes,
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу тестовыми пользователями, публикациями и"
+        " комментариями и нагружает страницы блога, выводя RPS,"
+        " перцентили задержки и число запросов к БД по маршрутам в JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--posts", type=int, default=200)
+        parser.add_argument("--comments", type=int, default=1000)
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument(
+            "--mix",
+            default=DEFAULT_MIX,
+            help="Веса маршрутов, например index=50,detail=50.",
+        )
+        parser.add_argument(
+            "--anonymous",
+            type=float,
+            default=0.5,
+            help="Доля читающих запросов без авторизации.",
+        )
+        parser.add_argument(
+            "--url",
+            help=(
+                "Адрес запущенного сервера, например http://127.0.0.1:8000."
+                " Без него запросы идут в приложение внутри процесса."
+            ),
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Заголовок Host для запросов внутри процесса.",
+        )
+        parser.add_argument("--random-seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options["mix"])
+        if options["users"] < 1 or options["posts"] < options["users"]:
+            raise CommandError(
+                "Нужен хотя бы один пользователь и не меньше публикаций,"
+                " чем пользователей."
+            )
+        rng = random.Random(options["random_seed"])
+        category, location, authors, posts = seed(
+            options["users"], options["posts"], options["comments"], rng
+        )
+        plan = queue.Queue()
+        for route in rng.choices(
+            list(mix), list(mix.values()), k=options["requests"]
+        ):
+            plan.put(route)
+        workers = []
+        for number in range(options["concurrency"]):
+            user = authors[number % len(authors)]
+            if options["url"]:
+                transport = HttpTransport(user, options["url"])
+            else:
+                transport = InProcessTransport(user, options["host"])
+            scenario = Scenario(
+                category,
+                location,
+                authors,
+                posts,
+                user,
+                random.Random(rng.random()),
+            )
+            workers.append((transport, scenario))
+        results = []
+        request_logger = logging.getLogger("blog.timing")
+        level = request_logger.level
+        request_logger.setLevel(logging.WARNING)
+        start = time.perf_counter()
+        try:
+            if len(workers) == 1:
+                run_worker(*workers[0], plan, options["anonymous"], results)
+            else:
+                threads = [
+                    threading.Thread(
+                        target=run_in_thread,
+                        args=(*worker, plan, options["anonymous"], results),
+                    )
+                    for worker in workers
+                ]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+        finally:
+            request_logger.setLevel(level)
+        seconds = time.perf_counter() - start
+        self.stdout.write(json.dumps(summarize(results, seconds), indent=2))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from blog.caching import bump_version
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = "Пересчитывает сохранённое количество комментариев у публикаций."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать расхождения, не исправляя их.",
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(
+            Post.objects.annotate(actual=Count("comments"))
+            .exclude(comment_count=F("actual"))
+            .values_list("pk", "comment_count", "actual")
+        )
+        for pk, stored, actual in drifted:
+            self.stdout.write(f"Публикация {pk}: {stored} -> {actual}")
+        if drifted and not options["dry_run"]:
+            actual_count = (
+                Comment.objects.filter(post=OuterRef("pk"))
+                .order_by()
+                .values("post")
+                .annotate(total=Count("pk"))
+                .values("total")
+            )
+            Post.objects.filter(pk__in=[pk for pk, _, _ in drifted]).update(
+                comment_count=Coalesce(
+                    Subquery(actual_count, output_field=IntegerField()), 0
+                )
+            )
+            for pk, _, _ in drifted:
+                bump_version("post", pk)
+        action = "Найдено" if options["dry_run"] else "Исправлено"
+        self.stdout.write(
+            self.style.SUCCESS(f"{action} расхождений: {len(drifted)}")
+        )
@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand
+
+from blog.images import queue_stale_variants
+from blog.jobs import claim_jobs, execute, finish
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет фоновые задачи из очереди (например, уменьшенные копии"
+        " фото) в пуле процессов."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Число процессов; 0 — выполнять задачи в этом процессе.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить накопившиеся задачи и завершить работу.",
+        )
+        parser.add_argument(
+            "--poll",
+            type=float,
+            default=1,
+            help="Пауза между проверками пустой очереди, в секундах.",
+        )
+        parser.add_argument(
+            "--stale-images",
+            action="store_true",
+            help=(
+                "Сначала поставить в очередь уменьшенные копии фото,"
+                " загруженных до их появления."
+            ),
+        )
+
+    def handle(self, *args, **options):
+        if options["stale_images"]:
+            queued = queue_stale_variants()
+            self.stdout.write(f"Фото в очереди на уменьшение: {queued}")
+        token = uuid.uuid4().hex
+        executor = None
+        if options["workers"]:
+            # Spawned workers set Django up from scratch and never inherit
+            # this process's database connections.
+            executor = ProcessPoolExecutor(
+                options["workers"],
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=django.setup,
+            )
+        try:
+            while True:
+                jobs = claim_jobs(max(options["workers"], 1) * 2, token)
+                if not jobs:
+                    if options["once"]:
+                        return
+                    time.sleep(options["poll"])
+                    continue
+                for job, error in self.run(executor, jobs):
+                    finish(job, error)
+                    status = "ошибка" if error else "готово"
+                    self.stdout.write(f"{job.kind} {job.payload}: {status}")
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def run(self, executor, jobs):
+        if executor is None:
+            for job in jobs:
+                yield job, execute(job.kind, job.payload)
+            return
+        futures = {
+            executor.submit(execute, job.kind, job.payload): job
+            for job in jobs
+        }
+        for future in as_completed(futures):
+            try:
+                error = future.result()
+            except Exception as exception:
+                error = repr(exception)
+            yield futures[future], error
@@ -0,0 +1,121 @@
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.sqlite import pragma_statements
+
+FEED_QUERY = "SELECT id, title FROM post ORDER BY pub_date DESC LIMIT 10"
+
+
+def connect(path, pragmas):
+    connection = sqlite3.connect(path, check_same_thread=False)
+    for statement in pragma_statements(pragmas):
+        connection.execute(statement)
+    return connection
+
+
+def create_schema(path, pragmas, rows):
+    connection = connect(path, pragmas)
+    connection.execute(
+        "CREATE TABLE post (id INTEGER PRIMARY KEY, pub_date TEXT, title TEXT)"
+    )
+    connection.execute("CREATE INDEX post_pub_date ON post (pub_date)")
+    connection.executemany(
+        "INSERT INTO post (pub_date, title)"
+        " VALUES (datetime(?, 'unixepoch'), ?)",
+        ((i, f"post {i}") for i in range(rows)),
+    )
+    connection.commit()
+    connection.close()
+
+
+def read_feed(connection):
+    connection.execute(FEED_QUERY).fetchall()
+
+
+def write_post(connection):
+    try:
+        connection.execute(
+            "INSERT INTO post (pub_date, title)"
+            " VALUES (datetime('now'), 'comment')"
+        )
+        connection.commit()
+    except sqlite3.OperationalError:
+        connection.rollback()
+        raise
+
+
+def hammer(path, pragmas, operation, stop, counter):
+    connection = connect(path, pragmas)
+    done = locked = 0
+    while not stop.is_set():
+        try:
+            operation(connection)
+            done += 1
+        except sqlite3.OperationalError:
+            locked += 1
+    connection.close()
+    counter.append((done, locked))
+
+
+def run_benchmark(path, pragmas, readers, writers, seconds, rows):
+    create_schema(path, pragmas, rows)
+    stop = threading.Event()
+    reads, writes = [], []
+    threads = [
+        threading.Thread(
+            target=hammer, args=(path, pragmas, operation, stop, counter)
+        )
+        for operation, counter, count in (
+            (read_feed, reads, readers),
+            (write_post, writes, writers),
+        )
+        for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return {
+        "reads_per_second": round(sum(d for d, _ in reads) / seconds, 1),
+        "writes_per_second": round(sum(d for d, _ in writes) / seconds, 1),
+        "locked_errors": sum(locked for _, locked in reads + writes),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Сравнивает пропускную способность чтения SQLite при параллельной"
+        " записи со стандартными настройками и с SQLITE_PRAGMAS."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--seconds", type=float, default=5)
+        parser.add_argument("--rows", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for name, pragmas in (
+                ("default", {}),
+                ("tuned", settings.SQLITE_PRAGMAS),
+            ):
+                results[name] = run_benchmark(
+                    str(Path(directory) / f"{name}.sqlite3"),
+                    pragmas,
+                    options["readers"],
+                    options["writers"],
+                    options["seconds"],
+                    options["rows"],
+                )
+        self.stdout.write(json.dumps(results, indent=2))
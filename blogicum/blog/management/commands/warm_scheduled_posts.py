@@ -0,0 +1,86 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import timezone
+
+from blog.caching import FEED_VERSION, bump_version, cache_is_shared
+from blog.models import Post
+from blog.scheduling import next_visibility_change
+
+
+class Command(BaseCommand):
+    help = (
+        "Следит за отложенными публикациями и прогревает кэш страниц"
+        " в момент их выхода."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Прогреть ленту один раз и завершить работу.",
+        )
+        parser.add_argument(
+            "--max-sleep",
+            type=float,
+            default=60,
+            help="Максимальная пауза между проверками, в секундах.",
+        )
+        parser.add_argument(
+            "--host",
+            default="localhost",
+            help="Значение заголовка Host для прогревающих запросов.",
+        )
+
+    def handle(self, *args, **options):
+        # Pages are rendered in this process; they only warm the web
+        # servers through a cache that all processes share.
+        if not cache_is_shared():
+            raise CommandError(
+                "Кэш по умолчанию виден только этому процессу, прогрев не"
+                " дойдёт до веб-серверов. Настройте общий кэш в CACHES."
+            )
+        factory = RequestFactory(HTTP_HOST=options["host"])
+        self.warm(factory, [reverse("blog:index")])
+        checked_at = timezone.now()
+        while not options["once"]:
+            upcoming = next_visibility_change(checked_at)
+            delay = options["max_sleep"]
+            if upcoming is not None:
+                delay = min(delay, (upcoming - timezone.now()).total_seconds())
+            time.sleep(max(delay, 0))
+            now = timezone.now()
+            went_live = list(
+                Post.objects.filter(
+                    is_published=True,
+                    category__is_published=True,
+                    pub_date__gt=checked_at,
+                    pub_date__lte=now,
+                ).select_related("category")
+            )
+            checked_at = now
+            if not went_live:
+                continue
+            bump_version(*FEED_VERSION)
+            urls = [reverse("blog:index")]
+            for post in went_live:
+                urls.append(reverse("blog:post_detail", args=[post.pk]))
+                urls.append(
+                    reverse("blog:category_posts", args=[post.category.slug])
+                )
+            self.warm(factory, dict.fromkeys(urls))
+
+    def warm(self, factory, urls):
+        """Render the pages with their views, as an anonymous visitor.
+
+        Middleware is skipped: the views store anonymous pages themselves.
+        """
+        for url in urls:
+            match = resolve(url)
+            request = factory.get(url)
+            request.user = AnonymousUser()
+            response = match.func(request, *match.args, **match.kwargs)
+            self.stdout.write(f"{response.status_code} {url}")
@@ -0,0 +1,274 @@
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+
+from blog.caching import cache_stats
+from blog.connections import connection_stats
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+
+HELP = {
+    "blog_http_requests_total": ("counter", "HTTP requests by route."),
+    "blog_http_request_duration_seconds": (
+        "histogram",
+        "HTTP request latency by route.",
+    ),
+    "blog_db_queries_total": ("counter", "Database queries by route."),
+    "blog_cache_requests_total": (
+        "counter",
+        "Cache lookups by cache and result.",
+    ),
+    "blog_cache_hit_ratio": (
+        "gauge",
+        "Share of cache lookups served from the cache.",
+    ),
+    "blog_db_connections_total": (
+        "counter",
+        "Database connections by event.",
+    ),
+    "blog_writes_total": ("counter", "Post and comment writes by action."),
+}
+
+
+class Registry:
+    """Counters and histograms of one process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+
+    def inc(self, name, labels, amount=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] += amount
+
+    def observe(self, name, labels, value):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            buckets, total, count = self.histograms.get(
+                key, ([0] * len(DURATION_BUCKETS), 0.0, 0)
+            )
+            buckets = [
+                hits + (value <= bound)
+                for hits, bound in zip(buckets, DURATION_BUCKETS)
+            ]
+            self.histograms[key] = (buckets, total + value, count + 1)
+
+    def snapshot(self):
+        with self.lock:
+            counters = [
+                [name, list(labels), value]
+                for (name, labels), value in self.counters.items()
+            ]
+            histograms = [
+                [name, list(labels), *histogram]
+                for (name, labels), histogram in self.histograms.items()
+            ]
+        for event, value in cache_stats().items():
+            cache, result = event.rsplit("_", 1)
+            counters.append([
+                "blog_cache_requests_total",
+                [["cache", cache], ["result", result]],
+                value,
+            ])
+        for event, value in connection_stats().items():
+            if event != "pid":
+                counters.append([
+                    "blog_db_connections_total", [["event", event]], value
+                ])
+        return {"counters": counters, "histograms": histograms}
+
+    def merge(self, snapshot):
+        """Add the counts of another process's snapshot to this one."""
+        for name, labels, value in snapshot["counters"]:
+            self.inc(name, dict(labels), value)
+        with self.lock:
+            for name, labels, buckets, total, count in snapshot["histograms"]:
+                key = (name, tuple(map(tuple, labels)))
+                old_buckets, old_total, old_count = self.histograms.get(
+                    key, ([0] * len(buckets), 0.0, 0)
+                )
+                self.histograms[key] = (
+                    [a + b for a, b in zip(old_buckets, buckets)],
+                    old_total + total,
+                    old_count + count,
+                )
+
+
+registry = Registry()
+_last_flush = 0.0
+_flush_lock = threading.Lock()
+
+
+def observe_request(route, method, status, seconds, queries):
+    registry.inc(
+        "blog_http_requests_total",
+        {"route": route, "method": method, "status": str(status)},
+    )
+    registry.observe(
+        "blog_http_request_duration_seconds", {"route": route}, seconds
+    )
+    if queries is not None:
+        registry.inc("blog_db_queries_total", {"route": route}, queries)
+
+
+def count_write(model, action):
+    registry.inc("blog_writes_total", {"model": model, "action": action})
+
+
+def flush(force=False):
+    """Write this process's snapshot to METRICS_DIR, at most once a second.
+
+    Every worker keeps its own file, so /metrics can sum all processes.
+    Threads share the file, so writes are serialized; a request thread
+    skips the flush while another one is writing.
+    """
+    global _last_flush
+    if not _flush_lock.acquire(blocking=force):
+        return
+    try:
+        now = time.monotonic()
+        if (
+            not force
+            and now - _last_flush < settings.METRICS_FLUSH_SECONDS
+        ):
+            return
+        _last_flush = now
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{os.getpid()}.json"
+        temporary = path.with_suffix(".tmp")
+        temporary.write_text(json.dumps(registry.snapshot()))
+        os.replace(temporary, path)
+    finally:
+        _flush_lock.release()
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def retire_exited_workers(directory):
+    """Fold the files of exited workers into this process's counters.
+
+    Recycled workers would otherwise leave a file each for good; folding
+    keeps the totals from dropping. Renaming a file claims it, so only one
+    process folds it. Windows has no harmless way to probe a process.
+    """
+    if os.name != "posix":
+        return
+    for path in directory.glob("*.json"):
+        if not path.stem.isdigit() or pid_alive(int(path.stem)):
+            continue
+        claimed = path.with_suffix(f".retired-{os.getpid()}")
+        try:
+            os.replace(path, claimed)
+        except FileNotFoundError:
+            continue
+        try:
+            registry.merge(json.loads(claimed.read_text()))
+        except (OSError, ValueError, KeyError):
+            pass
+        claimed.unlink()
+        path.with_suffix(".tmp").unlink(missing_ok=True)
+
+
+def collect():
+    """Sum the snapshots of all worker processes."""
+    directory = Path(settings.METRICS_DIR)
+    if directory.is_dir():
+        retire_exited_workers(directory)
+    flush(force=True)
+    counters = defaultdict(float)
+    histograms = {}
+    for path in directory.glob("*.json"):
+        try:
+            snapshot = json.loads(path.read_text())
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in snapshot["counters"]:
+            counters[name, tuple(map(tuple, labels))] += value
+        for name, labels, buckets, total, count in snapshot["histograms"]:
+            key = (name, tuple(map(tuple, labels)))
+            old_buckets, old_total, old_count = histograms.get(
+                key, ([0] * len(buckets), 0.0, 0)
+            )
+            histograms[key] = (
+                [a + b for a, b in zip(old_buckets, buckets)],
+                old_total + total,
+                old_count + count,
+            )
+    return counters, histograms
+
+
+def _escape(value):
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace('"', '\\"')
+        .replace("\n", "\\n")
+    )
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(
+        f'{key}="{_escape(value)}"' for key, value in pairs
+    ) + "}"
+
+
+def cache_hit_ratios(counters):
+    lookups = defaultdict(lambda: {"hits": 0, "misses": 0})
+    for (name, labels), value in counters.items():
+        if name == "blog_cache_requests_total":
+            labels = dict(labels)
+            lookups[labels["cache"]][labels["result"]] += value
+    return {
+        cache: results["hits"] / (results["hits"] + results["misses"])
+        for cache, results in lookups.items()
+        if results["hits"] + results["misses"]
+    }
+
+
+def render_metrics():
+    """Render all metrics in the Prometheus text exposition format."""
+    counters, histograms = collect()
+    series = defaultdict(list)
+    for (name, labels), value in sorted(counters.items()):
+        series[name].append(f"{name}{_labels(labels)} {value:g}")
+    for cache, ratio in sorted(cache_hit_ratios(counters).items()):
+        series["blog_cache_hit_ratio"].append(
+            f"blog_cache_hit_ratio{_labels([('cache', cache)])} {ratio:g}"
+        )
+    for (name, labels), (buckets, total, count) in sorted(
+        histograms.items()
+    ):
+        for bound, hits in zip(DURATION_BUCKETS, buckets):
+            bucket_labels = _labels((*labels, ("le", f"{bound:g}")))
+            series[name].append(f"{name}_bucket{bucket_labels} {hits}")
+        inf_labels = _labels((*labels, ("le", "+Inf")))
+        series[name].append(f"{name}_bucket{inf_labels} {count}")
+        series[name].append(f"{name}_sum{_labels(labels)} {total:g}")
+        series[name].append(f"{name}_count{_labels(labels)} {count}")
+    lines = []
+    for name, samples in series.items():
+        kind, description = HELP[name]
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {kind}")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,179 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from blog import metrics
+from blog.routers import allow_replica_reads, reset_replica_reads
+from blog.timing import record_timings
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+PRIMARY_PIN_COOKIE = "primary_pin"
+
+logger = logging.getLogger(__name__)
+timing_logger = logging.getLogger("blog.timing")
+
+
+class ReplicaRoutingMiddleware:
+    """Send safe requests to replicas unless the client wrote recently.
+
+    After a successful write the client gets a short-lived cookie that
+    pins its reads to the primary, so it sees its own posts and comments.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        safe = request.method in SAFE_METHODS
+        token = allow_replica_reads(
+            safe and PRIMARY_PIN_COOKIE not in request.COOKIES
+        )
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_replica_reads(token)
+        if not safe and response.status_code < 400:
+            response.set_cookie(
+                PRIMARY_PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+
+
+def add_server_timing(response, metric):
+    if "Server-Timing" in response:
+        metric = f"{response['Server-Timing']}, {metric}"
+    response["Server-Timing"] = metric
+
+
+class QueryBudgetMiddleware:
+    """Count queries per request and check them against the view's budget.
+
+    A view declares `query_budget = N`; requests over budget are logged,
+    or raise QueryBudgetExceeded when QUERY_BUDGET_STRICT is on.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        counter = QueryCounter()
+        request.query_counter = counter
+        request.query_budget = None
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+        add_server_timing(
+            response,
+            f"db;dur={counter.duration * 1000:.1f};"
+            f'desc="{counter.count} queries"',
+        )
+        budget = request.query_budget
+        if budget is not None and counter.count > budget:
+            message = (
+                f"{request.method} {request.path} made {counter.count} "
+                f"queries, budget is {budget}"
+            )
+            if settings.QUERY_BUDGET_STRICT:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view = getattr(view_func, "view_class", view_func)
+        request.query_budget = getattr(view, "query_budget", None)
+
+
+class RequestTimingMiddleware:
+    """Time the middleware, view and template phases of each request.
+
+    Must be the outermost middleware. Durations go to the Server-Timing
+    header, a JSON log line on the "blog.timing" logger, the in-memory
+    percentiles served by blog:timings and the Prometheus metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        marks = request.timing_marks = {}
+        start = time.perf_counter()
+        response = self.get_response(request)
+        end = time.perf_counter()
+        view_start = marks.get("view_start", end)
+        render_start = marks.get("render_start", end)
+        render_end = marks.get("render_end", render_start)
+        timings = {
+            "total": end - start,
+            "view": render_start - view_start,
+            "template": render_end - render_start,
+        }
+        timings["middleware"] = (
+            timings["total"] - timings["view"] - timings["template"]
+        )
+        counter = getattr(request, "query_counter", None)
+        if counter is not None:
+            timings["db"] = counter.duration
+        match = request.resolver_match
+        route = match.view_name if match else "unresolved"
+        metrics.observe_request(
+            route,
+            request.method,
+            response.status_code,
+            timings["total"],
+            counter.count if counter else None,
+        )
+        metrics.flush()
+        timings = {
+            phase: round(duration * 1000, 2)
+            for phase, duration in timings.items()
+        }
+        for phase in ("middleware", "view", "template", "total"):
+            add_server_timing(response, f"{phase};dur={timings[phase]}")
+        record_timings(route, timings)
+        timing_logger.info(json.dumps({
+            "method": request.method,
+            "path": request.path,
+            "route": route,
+            "status": response.status_code,
+            "db_queries": counter.count if counter else None,
+            **{f"{phase}_ms": value for phase, value in timings.items()},
+        }))
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.timing_marks["view_start"] = time.perf_counter()
+
+    def process_template_response(self, request, response):
+        marks = request.timing_marks
+        marks["render_start"] = time.perf_counter()
+        response.add_post_render_callback(
+            lambda rendered: marks.update(render_end=time.perf_counter())
+        )
+        return response
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.16 on 2026-10-18 13:14
+
+from django.db import migrations, models
+from django.db.models import Count
+import django.utils.timezone
+
+
+def count_image_references(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    StoredFile = apps.get_model("blog", "StoredFile")
+    StoredFile.objects.bulk_create(
+        StoredFile(name=row["image"], references=row["total"])
+        for row in Post.objects.exclude(image="")
+        .order_by()
+        .values("image")
+        .annotate(total=Count("pk"))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_job_queue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=256, unique=True, verbose_name='Путь')),
+                ('references', models.IntegerField(default=0, verbose_name='Число ссылок')),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Изменено')),
+            ],
+            options={
+                'verbose_name': 'файл',
+                'verbose_name_plural': 'Файлы',
+            },
+        ),
+        migrations.RunPython(
+            count_image_references, migrations.RunPython.noop
+        ),
+    ]
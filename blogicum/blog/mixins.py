@@ -1,17 +1,145 @@
-from django.db.models import Count
+import functools
+from http import HTTPStatus
+
+from django.core.paginator import InvalidPage
+from django.db.models import Q
 from django.http import Http404
-from django.shortcuts import redirect
+from django.shortcuts import get_object_or_404, redirect
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
-from blog.constants import POST_LIST_LIMIT
+from blog.caching import (FEED_VERSION, get_cached_page, mark_page_rendered,
+                          page_cache_key, page_validators, set_cached_page)
+from blog.constants import (COMMENT_LIST_LIMIT, PAGE_CACHE_TIMEOUT,
+                            POST_LIST_LIMIT)
 from blog.form import CommentForm, PostForm
 from blog.models import Comment, Post
+from blog.paginators import CursorPaginator
+from blog.routers import primary_reads
+from blog.scheduling import (last_visibility_check,
+                             seconds_until_visibility_change)
+from blog.uploads import ImageUploadHandler
+
+
+def view_memoized(method):
+    """Cache a view method's result on the view instance.
+
+    A view instance lives for exactly one request, so this is a
+    request-scoped cache; results are keyed by the call arguments.
+    """
+    attr = f"_memoized_{method.__name__}"
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        results = self.__dict__.setdefault(attr, {})
+        key = (args, tuple(sorted(kwargs.items())))
+        if key not in results:
+            results[key] = method(self, *args, **kwargs)
+        return results[key]
+
+    return wrapper
+
+
+class AnonymousPageCacheMixin:
+    page_cache_timeout = PAGE_CACHE_TIMEOUT
+
+    def get_page_cache_dependencies(self):
+        return [FEED_VERSION]
+
+    def get_page_cache_timeout(self):
+        delay = seconds_until_visibility_change()
+        if delay is None:
+            return self.page_cache_timeout
+        return min(self.page_cache_timeout, delay)
+
+    def get_page_changed_at(self):
+        """Latest moment the page may have changed without a write.
+
+        Feeds change by themselves when a scheduled post goes public.
+        """
+        return last_visibility_check()
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != "GET" or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        # Cached pages are filled from the primary, so replica lag never
+        # outlives a version stamp. Anonymous traffic is mostly served
+        # from the cache or with a 304, so replicas lose little load.
+        with primary_reads():
+            return self.anonymous_page(request, *args, **kwargs)
+
+    def anonymous_page(self, request, *args, **kwargs):
+        key = page_cache_key(request)
+        stamp, response, rendered = get_cached_page(
+            key, self.get_page_cache_dependencies()
+        )
+        etag, last_modified = page_validators(
+            stamp, self.get_page_changed_at()
+        )
+        # Without a page rendered under this stamp the URL may not resolve
+        # at all, so it is rendered first and only then checked.
+        not_modified = rendered and get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if not_modified:
+            response = not_modified
+        elif response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != HTTPStatus.OK or response.streaming:
+                return response
+            self.store_page(key, stamp, response)
+            if hasattr(response, "render"):
+                response.render()
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified,
+                response=response,
+            )
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def store_page(self, key, stamp, response):
+        request = self.request
+
+        def store(rendered):
+            if request.META.get("CSRF_COOKIE_USED") or rendered.cookies:
+                mark_page_rendered(key, stamp, self.get_page_cache_timeout())
+                return
+            set_cached_page(
+                key, stamp, rendered, self.get_page_cache_timeout()
+            )
 
+        if getattr(response, "is_rendered", True):
+            store(response)
+        else:
+            response.add_post_render_callback(store)
 
-class PostListMixin:
+
+class CursorPaginationMixin:
+    cursor_ordering = None
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.cursor_ordering:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(queryset, page_size, self.cursor_ordering)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get("after"),
+                before=self.request.GET.get("before"),
+            )
+        except InvalidPage as error:
+            raise Http404(str(error))
+        return paginator, page, page.object_list, page.has_other_pages()
+
+
+class PostListMixin(CursorPaginationMixin):
     model = Post
     paginate_by = POST_LIST_LIMIT
+    cursor_ordering = ("-pub_date", "-id")
 
     def get_queryset(self):
         queryset = self.posts_queryset().filter(
@@ -28,8 +156,60 @@ class PostListMixin:
                 "location",
                 "author"
             )
-            .annotate(comment_count=Count('comments'))
-            .order_by('-pub_date'))
+            .order_by("-pub_date"))
+
+
+class VisiblePostMixin:
+    model = Post
+    comment_ordering = ("created_at", "id")
+
+    @view_memoized
+    def get_object(self, queryset=None):
+        visible = Q(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lt=timezone.now(),
+        )
+        if self.request.user.is_authenticated:
+            visible |= Q(author=self.request.user)
+        obj = self.model.objects.select_related(
+            "category",
+            "location",
+            "author",
+        ).filter(visible)
+        return get_object_or_404(obj, pk=self.kwargs["pk"])
+
+    def get_comments_page(self):
+        paginator = CursorPaginator(
+            self.object.comments.select_related("author"),
+            COMMENT_LIST_LIMIT,
+            self.comment_ordering,
+        )
+        try:
+            return paginator.page(after=self.request.GET.get("after"))
+        except InvalidPage as error:
+            raise Http404(str(error))
+
+
+class ImageUploadMixin:
+    """Parse uploads with ImageUploadHandler and show its errors on the form.
+
+    Upload handlers can only be replaced before the body is read, and the
+    CSRF middleware reads it, so the check is moved inside the view.
+    """
+
+    @method_decorator(csrf_exempt)
+    def dispatch(self, request, *args, **kwargs):
+        request.upload_handlers = [ImageUploadHandler(request)]
+        return csrf_protect(super().dispatch)(request, *args, **kwargs)
+
+    def get_form(self, form_class=None):
+        form = super().get_form(form_class)
+        for field, message in getattr(
+            self.request, "upload_errors", {}
+        ).items():
+            form.add_error(field, message)
+        return form
 
 
 class PostMixin:
@@ -37,9 +217,13 @@ class PostMixin:
     template_name = "blog/create.html"
     form_class = PostForm
 
+    @view_memoized
+    def get_object(self, queryset=None):
+        return super().get_object(queryset)
+
     def dispatch(self, request, *args, **kwargs):
         self.object = self.get_object()
-        if self.object.author != request.user:
+        if self.object.author_id != request.user.id:
             return redirect("blog:post_detail", pk=kwargs["pk"])
         return super().dispatch(request, *args, **kwargs)
 
@@ -54,9 +238,10 @@ class CommentMixin:
     template_name = "blog/comment.html"
     pk_url_kwarg = "comment_id"
 
-    def get_object(self):
-        comment = super().get_object()
-        if comment.author != self.request.user:
+    @view_memoized
+    def get_object(self, queryset=None):
+        comment = super().get_object(queryset)
+        if comment.author_id != self.request.user.id:
             raise Http404
         return comment
 
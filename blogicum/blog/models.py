@@ -1,6 +1,8 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
 
+from blog.caching import bump_version
 from blog.constants import MAX_LENGTH, TEXT_LIMIT
 
 User = get_user_model()
@@ -81,16 +83,57 @@ class Post(PublishedModel):
         null=True,
         verbose_name="Категория",
     )
+    comment_count = models.PositiveIntegerField(
+        "Количество комментариев",
+        default=0,
+        editable=False,
+    )
+    image_variants = models.JSONField(
+        "Уменьшенные копии фото",
+        default=dict,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         default_related_name = "posts"
         verbose_name = "публикация"
         verbose_name_plural = "Публикации"
         ordering = ("-pub_date",)
+        indexes = (
+            models.Index(
+                fields=("pub_date",),
+                condition=models.Q(is_published=True),
+                name="post_published_pub_date_idx",
+            ),
+            models.Index(
+                fields=("category", "pub_date"),
+                condition=models.Q(is_published=True),
+                name="post_category_pub_date_idx",
+            ),
+            models.Index(
+                fields=("author", "pub_date"),
+                name="post_author_pub_date_idx",
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the StoredFile receivers notice a new image without a query.
+        instance._loaded_image = instance.__dict__.get("image") or ""
+        return instance
+
+    @classmethod
+    def change_comment_count(cls, post_id, delta):
+        cls.objects.filter(pk=post_id).update(
+            comment_count=models.F("comment_count") + delta
+        )
+        bump_version("post", post_id)
+
 
 class Comment(models.Model):
     text = models.TextField("text")
@@ -111,6 +154,80 @@ class Comment(models.Model):
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
         ordering = ("created_at",)
+        indexes = (
+            models.Index(
+                fields=("post", "created_at"),
+                name="comment_post_created_at_idx",
+            ),
+        )
 
     def __str__(self):
         return self.text
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the comment_count receivers notice a move to another post.
+        instance._loaded_post_id = instance.__dict__.get("post_id")
+        return instance
+
+
+class Job(models.Model):
+    PENDING = "pending"
+    RUNNING = "running"
+    FAILED = "failed"
+    STATUSES = (
+        (PENDING, "В очереди"),
+        (RUNNING, "Выполняется"),
+        (FAILED, "Ошибка"),
+    )
+
+    kind = models.CharField("Тип", max_length=MAX_LENGTH)
+    payload = models.JSONField("Параметры", default=dict)
+    status = models.CharField(
+        "Статус", max_length=16, choices=STATUSES, default=PENDING
+    )
+    attempts = models.PositiveIntegerField("Попытки", default=0)
+    run_after = models.DateTimeField("Не раньше", default=timezone.now)
+    locked_by = models.CharField(max_length=32, blank=True, editable=False)
+    locked_at = models.DateTimeField(null=True, blank=True, editable=False)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+    created_at = models.DateTimeField("Добавлено", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ("id",)
+        indexes = (
+            models.Index(
+                fields=("status", "run_after"),
+                name="job_status_run_after_idx",
+            ),
+        )
+
+    def __str__(self):
+        return f"{self.kind} {self.payload}"
+
+
+class StoredFile(models.Model):
+    name = models.CharField("Путь", max_length=MAX_LENGTH, unique=True)
+    references = models.IntegerField("Число ссылок", default=0)
+    updated_at = models.DateTimeField("Изменено", default=timezone.now)
+
+    class Meta:
+        verbose_name = "файл"
+        verbose_name_plural = "Файлы"
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def change_references(cls, name, delta):
+        updated = cls.objects.filter(name=name).update(
+            references=models.F("references") + delta,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            cls.objects.get_or_create(
+                name=name, defaults={"references": delta}
+            )
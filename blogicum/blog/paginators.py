@@ -0,0 +1,127 @@
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+
+
+class CursorPage(Sequence):
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<Cursor page of {len(self)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Keyset paginator: seeks by ordering values, never counts or offsets.
+
+    `ordering` must be unique across rows, so it should end with the
+    primary key, e.g. ("-pub_date", "-id").
+    """
+
+    is_cursor_based = True
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [
+            (name.lstrip("-"), name.startswith("-")) for name in self.ordering
+        ]
+
+    def encode_cursor(self, obj):
+        values = [
+            obj._meta.get_field(name).value_to_string(obj)
+            for name, _ in self.fields
+        ]
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            values = json.loads(raw)
+        except (binascii.Error, ValueError):
+            raise InvalidPage("Некорректный курсор страницы.")
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise InvalidPage("Некорректный курсор страницы.")
+        opts = self.queryset.model._meta
+        try:
+            values = [
+                opts.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, values)
+            ]
+        except (TypeError, ValidationError):
+            raise InvalidPage("Некорректный курсор страницы.")
+        if None in values:
+            raise InvalidPage("Некорректный курсор страницы.")
+        return values
+
+    def seek_filter(self, values, backwards=False):
+        condition = Q()
+        for index, (name, descending) in enumerate(self.fields):
+            lookup = "gt" if descending == backwards else "lt"
+            step = Q(**{f"{name}__{lookup}": values[index]})
+            for prev_index, (prev_name, _) in enumerate(self.fields[:index]):
+                step &= Q(**{prev_name: values[prev_index]})
+            condition |= step
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            name if descending else f"-{name}"
+            for name, descending in self.fields
+        ]
+
+    def page(self, after=None, before=None):
+        if after and before:
+            raise InvalidPage("Укажите только один курсор страницы.")
+        limit = self.per_page + 1
+        if before:
+            queryset = self.queryset.filter(
+                self.seek_filter(self.decode_cursor(before), backwards=True)
+            ).order_by(*self._reversed_ordering())
+            rows = list(queryset[:limit])
+            has_previous = len(rows) > self.per_page
+            rows = rows[:self.per_page][::-1]
+            has_next = True
+        else:
+            queryset = self.queryset
+            if after:
+                queryset = queryset.filter(
+                    self.seek_filter(self.decode_cursor(after))
+                )
+            rows = list(queryset.order_by(*self.ordering)[:limit])
+            has_next = len(rows) > self.per_page
+            rows = rows[:self.per_page]
+            has_previous = bool(after)
+        if not rows:
+            return CursorPage(rows, self, None, None)
+        return CursorPage(
+            rows,
+            self,
+            self.encode_cursor(rows[-1]) if has_next else None,
+            self.encode_cursor(rows[0]) if has_previous else None,
+        )
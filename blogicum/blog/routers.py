@@ -0,0 +1,119 @@
+import contextlib
+import contextvars
+import itertools
+import threading
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+_replicas_allowed = contextvars.ContextVar("replicas_allowed", default=False)
+_chosen_replica = contextvars.ContextVar("chosen_replica", default=None)
+_round_robin = itertools.count()
+_down_until = {}
+_down_lock = threading.Lock()
+
+
+def allow_replica_reads(allowed):
+    """Enable replica reads for the current request; returns a reset token.
+
+    The request starts without a chosen replica, see `choose_replica`.
+    """
+    return _replicas_allowed.set(allowed), _chosen_replica.set(None)
+
+
+def reset_replica_reads(token):
+    allowed_token, chosen_token = token
+    _chosen_replica.reset(chosen_token)
+    _replicas_allowed.reset(allowed_token)
+
+
+@contextlib.contextmanager
+def primary_reads():
+    """Read from the primary inside the block, whatever the request allows.
+
+    Used for data that ends up in the shared caches: a lagging replica
+    would put old rows there under a new version stamp.
+    """
+    token = allow_replica_reads(False)
+    try:
+        yield
+    finally:
+        reset_replica_reads(token)
+
+
+def read_from_replica(instance):
+    return instance._state.db in settings.DATABASE_REPLICAS
+
+
+def _is_down(alias):
+    with _down_lock:
+        return _down_until.get(alias, 0) > time.monotonic()
+
+
+def _mark_down(alias):
+    with _down_lock:
+        _down_until[alias] = time.monotonic() + settings.REPLICA_RETRY_SECONDS
+
+
+def choose_replica():
+    """Pick the next healthy replica, falling back to the primary.
+
+    The choice is kept for the rest of the request, so the connection is
+    checked once per request and all its reads see the same snapshot.
+    """
+    chosen = _chosen_replica.get()
+    if chosen is not None:
+        return chosen
+    alias = _pick_replica()
+    _chosen_replica.set(alias)
+    return alias
+
+
+def _pick_replica():
+    replicas = settings.DATABASE_REPLICAS
+    start = next(_round_robin)
+    for offset in range(len(replicas)):
+        alias = replicas[(start + offset) % len(replicas)]
+        if _is_down(alias):
+            continue
+        try:
+            connections[alias].ensure_connection()
+        except DatabaseError:
+            _mark_down(alias)
+            continue
+        return alias
+    return DEFAULT_DB_ALIAS
+
+
+class ReplicaRouter:
+    route_app_labels = {"blog"}
+
+    def _routed(self, model):
+        return (
+            settings.DATABASE_REPLICAS
+            and model._meta.app_label in self.route_app_labels
+        )
+
+    def db_for_read(self, model, **hints):
+        if not self._routed(model):
+            return None
+        if not _replicas_allowed.get():
+            return DEFAULT_DB_ALIAS
+        return choose_replica()
+
+    def db_for_write(self, model, **hints):
+        if not self._routed(model):
+            return None
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,63 @@
+import math
+
+from django.db.models import Min
+from django.utils import timezone
+
+from blog.caching import FEED_VERSION, get_stamped, set_stamped
+from blog.models import Post
+
+SCHEDULE_KEY = "blog:schedule:next"
+
+
+def scheduled_posts(now=None):
+    """Posts that are hidden now only because their pub_date is ahead."""
+    return Post.objects.filter(
+        is_published=True,
+        category__is_published=True,
+        pub_date__gt=now or timezone.now(),
+    )
+
+
+def next_publication(now=None):
+    """Return the nearest future pub_date of a post that will go public."""
+    return scheduled_posts(now).aggregate(upcoming=Min("pub_date"))[
+        "upcoming"
+    ]
+
+
+def visibility_state(now=None):
+    """Cached `next_publication` and the moment it was looked up.
+
+    The cached value is tied to the feed stamp, so creating, editing or
+    unpublishing posts and categories recomputes it; so does reaching the
+    next publication. Feeds therefore never change by themselves after
+    the lookup time, until the next publication.
+    """
+    now = now or timezone.now()
+    stamp, cached = get_stamped(SCHEDULE_KEY, [FEED_VERSION])
+    if cached is not None and (cached[0] is None or cached[0] > now):
+        return cached
+    upcoming = next_publication(now)
+    timeout = None
+    if upcoming is not None:
+        timeout = math.ceil((upcoming - now).total_seconds())
+    cached = (upcoming, now.timestamp())
+    set_stamped(SCHEDULE_KEY, stamp, cached, timeout)
+    return cached
+
+
+def next_visibility_change(now=None):
+    """The next instant a feed changes by itself."""
+    return visibility_state(now)[0]
+
+
+def last_visibility_check(now=None):
+    return visibility_state(now)[1]
+
+
+def seconds_until_visibility_change(now=None):
+    now = now or timezone.now()
+    upcoming = next_visibility_change(now)
+    if upcoming is None:
+        return None
+    return max(1, math.ceil((upcoming - now).total_seconds()))
@@ -0,0 +1,119 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from blog.caching import FEED_VERSION, bump_version, bump_versions
+from blog.images import queue_variants, variants_stale
+from blog.metrics import count_write
+from blog.models import Category, Comment, Location, Post, StoredFile
+
+User = get_user_model()
+
+
+def bump_feed():
+    bump_version(*FEED_VERSION)
+
+
+@receiver([post_save, post_delete], sender=Post)
+@receiver([post_save, post_delete], sender=Comment)
+def write_counted(sender, signal, created=False, **kwargs):
+    if signal is post_delete:
+        action = "deleted"
+    else:
+        action = "created" if created else "updated"
+    count_write(sender._meta.model_name, action)
+
+
+@receiver([post_save, post_delete], sender=Post)
+def post_changed(sender, instance, **kwargs):
+    bump_version("post", instance.pk)
+    bump_feed()
+
+
+@receiver(post_save, sender=Post)
+def post_image_changed(sender, instance, **kwargs):
+    if variants_stale(instance):
+        queue_variants(instance)
+
+
+@receiver(post_save, sender=Post)
+def count_image_references(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and "image" not in update_fields:
+        return
+    previous = getattr(instance, "_loaded_image", "")
+    current = instance.image.name or ""
+    if current != previous:
+        if current:
+            StoredFile.change_references(current, 1)
+        if previous:
+            StoredFile.change_references(previous, -1)
+    instance._loaded_image = current
+
+
+@receiver(post_delete, sender=Post)
+def release_image(sender, instance, **kwargs):
+    if instance.image:
+        StoredFile.change_references(instance.image.name, -1)
+
+
+@receiver(post_save, sender=Comment)
+def count_saved_comment(sender, instance, created, **kwargs):
+    previous = (
+        None if created
+        else getattr(instance, "_loaded_post_id", instance.post_id)
+    )
+    if previous != instance.post_id:
+        Post.change_comment_count(instance.post_id, 1)
+        if previous is not None:
+            Post.change_comment_count(previous, -1)
+    instance._loaded_post_id = instance.post_id
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    Post.change_comment_count(instance.post_id, -1)
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    bump_version("post", instance.post_id)
+    bump_feed()
+
+
+@receiver([post_save, pre_delete], sender=Category)
+def category_changed(sender, instance, **kwargs):
+    bump_version("category", instance.pk)
+    bump_versions(
+        "post",
+        Post.objects.filter(category=instance).values_list("pk", flat=True),
+    )
+    bump_feed()
+
+
+@receiver([post_save, pre_delete], sender=Location)
+def location_changed(sender, instance, **kwargs):
+    bump_version("location", instance.pk)
+    bump_versions(
+        "post",
+        Post.objects.filter(location=instance).values_list("pk", flat=True),
+    )
+    bump_feed()
+
+
+@receiver([post_save, post_delete], sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {"last_login"}:
+        return
+    bump_version("user", instance.pk)
+    bump_versions(
+        "post",
+        Post.objects.filter(author=instance)
+        .order_by()
+        .values_list("pk", flat=True)
+        .union(
+            Comment.objects.filter(author=instance)
+            .order_by()
+            .values_list("post_id", flat=True)
+        ),
+    )
+    bump_feed()
@@ -0,0 +1,86 @@
+import hashlib
+import os
+import re
+import tempfile
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.views.static import serve
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+CONTENT_ADDRESSED_RE = re.compile(
+    r"^(?:[^/]+/)?[0-9a-f]{2}/[0-9a-f]{2}/[0-9a-f]{64}\.\w+$"
+)
+INCOMING_DIR = ".incoming"
+
+
+def content_name(name, digest):
+    """post_photo/cat.JPG -> post_photo/ab/cd/abcd...ef.jpg"""
+    path = PurePosixPath(name)
+    prefix = f"{path.parts[0]}/" if len(path.parts) > 1 else ""
+    return (
+        f"{prefix}{digest[:2]}/{digest[2:4]}/{digest}{path.suffix.lower()}"
+    )
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Stores files under the SHA-256 of their content.
+
+    Saving bytes that are already stored writes nothing and returns the
+    existing name, so URLs never change meaning and can be cached forever.
+    Files are only removed by the collect_media command.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        incoming = self.path(INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        digest = hashlib.sha256()
+        descriptor, temporary = tempfile.mkstemp(dir=incoming)
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                if hasattr(content, "seek"):
+                    content.seek(0)
+                for chunk in content.chunks():
+                    digest.update(chunk)
+                    file.write(chunk)
+            name = content_name(name, digest.hexdigest())
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                # The file may be an orphan about to be collected; a fresh
+                # mtime puts it back inside collect_media's grace window.
+                os.utime(full_path)
+                return name
+            os.makedirs(
+                os.path.dirname(full_path),
+                self.directory_permissions_mode or 0o777,
+                exist_ok=True,
+            )
+            if self.file_permissions_mode is not None:
+                os.chmod(temporary, self.file_permissions_mode)
+            os.replace(temporary, full_path)
+            return name
+        finally:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+
+def is_content_addressed(name):
+    return bool(CONTENT_ADDRESSED_RE.match(name))
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """Development media view that marks content-addressed files immutable.
+
+    In production the web server serving MEDIA_ROOT should send the same
+    Cache-Control header for these paths.
+    """
+    response = serve(
+        request, path, document_root or settings.MEDIA_ROOT, show_indexes
+    )
+    if response.status_code == 200 and is_content_addressed(path):
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
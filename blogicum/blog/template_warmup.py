@@ -0,0 +1,35 @@
+import logging
+from pathlib import Path
+
+from django.template import TemplateSyntaxError, engines
+
+logger = logging.getLogger(__name__)
+
+
+def project_templates(directories):
+    names = set()
+    for directory in map(Path, directories):
+        names.update(
+            path.relative_to(directory).as_posix()
+            for path in directory.rglob("*")
+            if path.is_file()
+        )
+    return sorted(names)
+
+
+def warm_templates(using="django"):
+    """Compile every template from DIRS into the cached loader.
+
+    Called once per worker at startup, so the first requests do not pay
+    for reading and parsing base.html, includes and the page templates.
+    """
+    backend = engines[using]
+    compiled = 0
+    for name in project_templates(backend.engine.dirs):
+        try:
+            backend.get_template(name)
+        except TemplateSyntaxError:
+            logger.exception("Шаблон %s не компилируется", name)
+        else:
+            compiled += 1
+    return compiled
@@ -0,0 +1,65 @@
+from urllib.parse import quote
+
+from django import template
+from django.utils.safestring import mark_safe
+
+from blog.caching import render_post_card
+from blog.constants import POST_IMAGE_SIZES
+from blog.images import variants_stale
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post):
+    return mark_safe(render_post_card(post))
+
+
+@register.inclusion_tag("includes/post_image.html")
+def post_image(post, lazy=True):
+    """Responsive <picture> for the post photo with srcset and sizes.
+
+    While the variants are being made a same-sized placeholder is shown;
+    images without variants yet are shown as is. Rendering never writes:
+    variants are queued on save and by run_jobs --stale-images.
+    """
+    if variants_stale(post):
+        return {"post": post}
+    if post.image_variants.get("pending"):
+        return {"post": post, "placeholder": placeholder(post.image_variants)}
+    storage = post.image.storage
+    srcsets = {}
+    largest = None
+    for variant in post.image_variants.get("variants", []):
+        srcsets.setdefault(variant["format"], []).append(
+            f"{storage.url(variant['name'])} {variant['width']}w"
+        )
+        if variant["format"] == "jpeg":
+            largest = variant
+    return {
+        "post": post,
+        "webp_srcset": ", ".join(srcsets.get("webp", [])),
+        "jpeg_srcset": ", ".join(srcsets.get("jpeg", [])),
+        "fallback": largest and {
+            "url": storage.url(largest["name"]),
+            "width": largest["width"],
+            "height": largest["height"],
+        },
+        "sizes": POST_IMAGE_SIZES,
+        "lazy": lazy,
+    }
+
+
+def placeholder(variants):
+    width = variants.get("width", 4)
+    height = variants.get("height", 3)
+    svg = (
+        "<svg xmlns='http://www.w3.org/2000/svg'"
+        f" viewBox='0 0 {width} {height}'>"
+        "<rect width='100%' height='100%' fill='#e9ecef'/></svg>"
+    )
+    return {
+        "url": f"data:image/svg+xml,{quote(svg)}",
+        "width": width,
+        "height": height,
+    }
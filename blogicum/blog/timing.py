@@ -0,0 +1,35 @@
+import threading
+from collections import defaultdict, deque
+
+from blog.constants import TIMING_SAMPLES
+
+PHASES = ("total", "middleware", "view", "template", "db")
+
+_samples = defaultdict(lambda: deque(maxlen=TIMING_SAMPLES))
+_samples_lock = threading.Lock()
+
+
+def record_timings(route, timings):
+    with _samples_lock:
+        for phase, duration in timings.items():
+            _samples[route, phase].append(duration)
+
+
+def percentile(ordered, fraction):
+    index = max(0, min(len(ordered) - 1, round(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+
+def timing_summary():
+    """Latency percentiles, in ms, over the latest requests of each route."""
+    with _samples_lock:
+        snapshot = {key: sorted(values) for key, values in _samples.items()}
+    summary = defaultdict(dict)
+    for (route, phase), ordered in sorted(snapshot.items()):
+        summary[route][phase] = {
+            "count": len(ordered),
+            "p50": round(percentile(ordered, 0.5), 2),
+            "p95": round(percentile(ordered, 0.95), 2),
+            "p99": round(percentile(ordered, 0.99), 2),
+        }
+    return dict(summary)
@@ -0,0 +1,141 @@
+import logging
+import time
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadhandler import (SkipFile,
+                                             TemporaryFileUploadHandler)
+from django.template.defaultfilters import filesizeformat
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SIGNATURES = (
+    b"\xff\xd8\xff", b"\x89PNG\r\n\x1a\n", b"GIF87a", b"GIF89a"
+)
+FORMAT_ERROR = "Загрузите изображение в формате JPEG, PNG, GIF или WebP."
+PIXELS_ERROR = "Изображение слишком большое, уменьшите его."
+# JPEG headers carry EXIF and ICC blocks before the frame size.
+HEADER_LIMIT = 512 * 1024
+
+
+def is_image_header(data):
+    return data.startswith(IMAGE_SIGNATURES) or (
+        data[:4] == b"RIFF" and data[8:12] == b"WEBP"
+    )
+
+
+def webp_size(header):
+    """Canvas size from the first chunk of a WebP file."""
+    chunk = header[12:16]
+    if chunk == b"VP8X" and len(header) >= 30:
+        return (
+            int.from_bytes(header[24:27], "little") + 1,
+            int.from_bytes(header[27:30], "little") + 1,
+        )
+    if chunk == b"VP8 " and len(header) >= 30:
+        return (
+            int.from_bytes(header[26:28], "little") & 0x3FFF,
+            int.from_bytes(header[28:30], "little") & 0x3FFF,
+        )
+    if chunk == b"VP8L" and len(header) >= 25:
+        bits = int.from_bytes(header[21:25], "little")
+        return (bits & 0x3FFF) + 1, (bits >> 14 & 0x3FFF) + 1
+    return None
+
+
+def header_size(header):
+    """Image size from the first bytes of a file, or None if not there yet.
+
+    Image.open only parses the header, the pixel data is never decoded.
+    Pillow needs the whole file to open a WebP, so its header is read here.
+    """
+    if header.startswith(b"RIFF"):
+        return webp_size(header)
+    try:
+        with Image.open(BytesIO(header)) as image:
+            return image.size
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """Streams image uploads to a temporary file and rejects bad ones early.
+
+    A rejected file is skipped without being written further; the reason
+    is kept in request.upload_errors for the view to show on the form.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = settings.POST_IMAGE_MAX_SIZE
+        self.max_pixels = settings.POST_IMAGE_MAX_PIXELS
+        self.request_length = None
+        if request is not None and not hasattr(request, "upload_errors"):
+            request.upload_errors = {}
+
+    def handle_raw_input(
+        self, input_data, meta, content_length, boundary, encoding=None
+    ):
+        self.request_length = content_length
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.started = time.monotonic()
+        self.received = 0
+        self.header = b""
+        self.size = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0:
+            self.check_first_chunk(raw_data)
+        self.received += len(raw_data)
+        if self.received > self.max_size:
+            self.reject(self.size_error())
+        if self.size is None and len(self.header) < HEADER_LIMIT:
+            self.header += raw_data[:HEADER_LIMIT - len(self.header)]
+            try:
+                self.size = header_size(self.header)
+            except Image.DecompressionBombError:
+                self.reject(PIXELS_ERROR)
+            if self.size and self.size[0] * self.size[1] > self.max_pixels:
+                self.reject(PIXELS_ERROR)
+        return super().receive_data_chunk(raw_data, start)
+
+    def check_first_chunk(self, raw_data):
+        if not is_image_header(raw_data):
+            self.reject(FORMAT_ERROR)
+        # Other fields are capped by DATA_UPLOAD_MAX_MEMORY_SIZE, so a body
+        # this long can only come from an oversize file.
+        other_fields = settings.DATA_UPLOAD_MAX_MEMORY_SIZE
+        if (
+            None not in (other_fields, self.request_length)
+            and self.request_length - other_fields > self.max_size
+        ):
+            self.reject(self.size_error())
+
+    def size_error(self):
+        return (
+            "Размер файла не должен превышать"
+            f" {filesizeformat(self.max_size)}."
+        )
+
+    def reject(self, message):
+        logger.info("Загрузка %s отклонена: %s", self.file_name, message)
+        if self.request is not None:
+            self.request.upload_errors[self.field_name] = message
+        raise SkipFile(message)
+
+    def file_complete(self, file_size):
+        seconds = max(time.monotonic() - self.started, 1e-6)
+        width, height = self.size or (None, None)
+        logger.info(
+            "Загрузка %s: %d байт за %.3f с (%.1f МБ/с), %s×%s",
+            self.file_name,
+            file_size,
+            seconds,
+            file_size / seconds / 1024 / 1024,
+            width,
+            height,
+        )
+        return super().file_complete(file_size)
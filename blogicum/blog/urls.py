@@ -20,6 +20,11 @@ post_urls = [
 ]
 
 comments_urls = [
+    path(
+        "<int:pk>/comments/",
+        views.CommentListView.as_view(),
+        name="post_comments",
+    ),
     path(
         "<int:pk>/comment/",
         views.CommentCreateView.as_view(),
@@ -63,5 +68,7 @@ urlpatterns = [
          views.PostListView.as_view(),
          name="profile"
          ),
+    path("debug/timings/", views.TimingsView.as_view(), name="timings"),
+    path("metrics", views.MetricsView.as_view(), name="metrics"),
     path("", views.IndexListView.as_view(), name="index"),
 ]
@@ -1,21 +1,29 @@
-from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import Q
+from django.conf import settings
+from django.contrib.auth.mixins import (LoginRequiredMixin,
+                                        UserPassesTestMixin)
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404
+from django.template.loader import render_to_string
 from django.urls import reverse
-from django.utils import timezone
 from django.views.generic import (CreateView, DeleteView, DetailView, ListView,
-                                  UpdateView)
+                                  UpdateView, View)
 
 from blog.form import CommentForm, PostForm
-from blog.mixins import CommentMixin, PostListMixin, PostMixin
+from blog.mixins import (AnonymousPageCacheMixin, CommentMixin,
+                         ImageUploadMixin, PostListMixin, PostMixin,
+                         VisiblePostMixin, view_memoized)
+from blog.metrics import render_metrics
 from blog.models import Category, Comment, Post, User
+from blog.timing import timing_summary
 
 
-class IndexListView(PostListMixin, ListView):
+class IndexListView(AnonymousPageCacheMixin, PostListMixin, ListView):
     template_name = "blog/index.html"
+    query_budget = 3
 
 
-class PostCreateView(LoginRequiredMixin, CreateView):
+class PostCreateView(ImageUploadMixin, LoginRequiredMixin, CreateView):
     model = Post
     form_class = PostForm
     template_name = "blog/create.html"
@@ -29,29 +37,56 @@ class PostCreateView(LoginRequiredMixin, CreateView):
                        kwargs={"username": self.request.user.username})
 
 
-class PostDetailView(DetailView):
-    model = Post
+class PostDetailView(AnonymousPageCacheMixin, VisiblePostMixin, DetailView):
     template_name = "blog/detail.html"
+    query_budget = 4
 
-    def get_object(self, queryset=None):
-        obj = Post.objects.filter(
-            Q(
-                is_published=True,
-                category__is_published=True,
-                pub_date__lt=timezone.now(),
-            )
-            | Q(author=self.request.user)
-        )
-        return get_object_or_404(obj, pk=self.kwargs["pk"])
+    def get_page_cache_dependencies(self):
+        return [("post", self.kwargs["pk"])]
+
+    def get_page_cache_timeout(self):
+        return self.page_cache_timeout
+
+    def get_page_changed_at(self):
+        return None
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context["form"] = CommentForm()
-        context["comments"] = self.object.comments.select_related("author")
+        context["comments"] = self.get_comments_page()
         return context
 
 
-class PostUpdateView(LoginRequiredMixin, PostMixin, UpdateView):
+class CommentListView(VisiblePostMixin, DetailView):
+    template_name = "includes/comment_list.html"
+    query_budget = 4
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context["comments"] = self.get_comments_page()
+        return context
+
+    def render_to_response(self, context, **response_kwargs):
+        comments = context["comments"]
+        next_url = None
+        if comments.has_next():
+            next_url = (
+                reverse("blog:post_comments", args=[self.object.pk])
+                + f"?after={comments.next_cursor}"
+            )
+        return JsonResponse(
+            {
+                "html": render_to_string(
+                    self.template_name, context, request=self.request
+                ),
+                "next": next_url,
+            }
+        )
+
+
+class PostUpdateView(
+    ImageUploadMixin, LoginRequiredMixin, PostMixin, UpdateView
+):
     pass
 
 
@@ -62,27 +97,32 @@ class PostDeleteView(LoginRequiredMixin, PostMixin, DeleteView):
         return context
 
 
-class CategoryListView(PostListMixin, ListView):
+class CategoryListView(AnonymousPageCacheMixin, PostListMixin, ListView):
     template_name = "blog/category.html"
+    query_budget = 4
 
-    def get_queryset(self):
-        category_slug = self.kwargs["category_slug"]
-        self.category = get_object_or_404(
+    @view_memoized
+    def get_category(self):
+        return get_object_or_404(
             Category,
-            slug=category_slug,
+            slug=self.kwargs["category_slug"],
             is_published=True,
         )
-        return super().get_queryset().filter(category=self.category)
+
+    def get_queryset(self):
+        return super().get_queryset().filter(category=self.get_category())
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["category"] = self.category
+        context["category"] = self.get_category()
         return context
 
 
 class PostListView(PostListMixin, ListView):
     template_name = "blog/profile.html"
+    query_budget = 4
 
+    @view_memoized
     def get_object(self):
         return get_object_or_404(User, username=self.kwargs["username"])
 
@@ -137,3 +177,21 @@ class CommentUpdateView(LoginRequiredMixin, CommentMixin, UpdateView):
 
 class CommentDeleteView(LoginRequiredMixin, CommentMixin, DeleteView):
     pass
+
+
+class TimingsView(UserPassesTestMixin, View):
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(timing_summary())
+
+
+class MetricsView(View):
+    def get(self, request, *args, **kwargs):
+        if request.META.get("REMOTE_ADDR") not in settings.METRICS_ALLOWED_IPS:
+            raise PermissionDenied
+        return HttpResponse(
+            render_metrics(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
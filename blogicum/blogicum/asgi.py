@@ -5,3 +5,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "blogicum.settings")
 
 application = get_asgi_application()
+
+from blog.template_warmup import warm_templates  # noqa: E402
+
+warm_templates()
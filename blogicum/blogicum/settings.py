@@ -1,3 +1,5 @@
+import os
+import tempfile
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -21,11 +23,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "blog.middleware.RequestTimingMiddleware",
+    "blog.middleware.QueryBudgetMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "blog.middleware.ReplicaRoutingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -34,12 +39,22 @@ ROOT_URLCONF = "blogicum.urls"
 
 TEMPLATES_DIR = BASE_DIR / "templates"
 
+TEMPLATE_LOADERS = [
+    "django.template.loaders.filesystem.Loader",
+    "django.template.loaders.app_directories.Loader",
+]
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [TEMPLATES_DIR],
-        "APP_DIRS": True,
+        # Loaders are listed explicitly so the cached loader is used even
+        # with DEBUG on; runserver's autoreloader resets it on edits.
+        "APP_DIRS": False,
         "OPTIONS": {
+            "loaders": [
+                ("django.template.loaders.cached.Loader", TEMPLATE_LOADERS),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -56,6 +71,91 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+    }
+}
+
+# Ping persistent connections before reuse; 0 turns it off.
+DB_HEALTH_CHECKS = bool(int(os.environ.get("DB_HEALTH_CHECKS", 1)))
+
+# Aliases from DATABASES that replicate "default"; give each of them
+# "TEST": {"MIRROR": "default"} so tests run against one database.
+# Cached pages and post cards are only ever built from the primary, so
+# replicas serve the uncached reads: signed-in pages, profiles, comments.
+DATABASE_REPLICAS = []
+
+DATABASE_ROUTERS = ["blog.routers.ReplicaRouter"]
+
+REPLICA_PIN_SECONDS = 10
+
+REPLICA_RETRY_SECONDS = 30
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        # INFO adds a JSON line per request (blog.timing) and upload stats.
+        "blog": {
+            "handlers": ["console"],
+            "level": os.environ.get("BLOG_LOG_LEVEL", "WARNING"),
+        },
+    },
+}
+
+# Raise instead of logging when a view exceeds its query_budget.
+QUERY_BUDGET_STRICT = False
+
+# Every worker process writes its counters to a file here; the directory
+# must be shared by all workers of one host. Files of exited workers are
+# folded into a live worker's counters when /metrics is collected.
+METRICS_DIR = os.environ.get(
+    "METRICS_DIR", Path(tempfile.gettempdir()) / "blogicum-metrics"
+)
+
+METRICS_FLUSH_SECONDS = 1
+
+METRICS_ALLOWED_IPS = ["127.0.0.1"]
+
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# Post cards and pages are invalidated through version stamps kept in this
+# cache, so every process must see the same one: web workers, run_jobs and
+# management commands. Per-process backends such as LocMemCache fail the
+# blog.W001 check. In production point CACHE_BACKEND at memcached, e.g.
+# django.core.cache.backends.memcached.PyMemcacheCache with
+# CACHE_LOCATION=127.0.0.1:11211.
+#
+# The default file cache is shared by processes on one host and needs no
+# server, but every set lists the cache directory to decide on culling, so
+# writes slow down as entries pile up. MAX_ENTRIES is kept well above what
+# the pages and post cards of a small blog need; once reached, a tenth of
+# the entries is culled. Stamps survive culling only by chance, which is
+# safe: a lost stamp is replaced by a new unique one and costs a miss.
+CACHE_BACKEND = os.environ.get(
+    "CACHE_BACKEND", "django.core.cache.backends.filebased.FileBasedCache"
+)
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKEND,
+        "LOCATION": os.environ.get(
+            "CACHE_LOCATION", Path(tempfile.gettempdir()) / "blogicum-cache"
+        ),
+        "OPTIONS": (
+            {"MAX_ENTRIES": 50000, "CULL_FREQUENCY": 10}
+            if CACHE_BACKEND.endswith(".FileBasedCache")
+            else {}
+        ),
     }
 }
 
@@ -88,6 +188,14 @@ STATIC_URL = "/static/"
 
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Uploads are stored by content hash; see blog.storage.
+DEFAULT_FILE_STORAGE = "blog.storage.ContentAddressedStorage"
+
+# Limits checked while a post photo is still uploading; see blog.uploads.
+POST_IMAGE_MAX_SIZE = 10 * 1024 * 1024
+
+POST_IMAGE_MAX_PIXELS = 40_000_000
+
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
@@ -5,6 +5,8 @@ from django.contrib.auth.forms import UserCreationForm
 from django.urls import include, path, reverse_lazy
 from django.views.generic.edit import CreateView
 
+from blog.storage import serve_media
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("pages/", include("pages.urls", namespace="pages")),
@@ -23,7 +25,4 @@ urlpatterns = [
 handler404 = "pages.views.page_not_found"
 handler500 = "pages.views.server_error"
 if settings.DEBUG:
-    urlpatterns += static(
-        settings.MEDIA_URL,
-        document_root=settings.MEDIA_ROOT
-    )
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media)
@@ -5,3 +5,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "blogicum.settings")
 
 application = get_wsgi_application()
+
+from blog.template_warmup import warm_templates  # noqa: E402
+
+warm_templates()
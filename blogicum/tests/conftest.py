@@ -10,6 +10,7 @@ from typing import (Any, Iterable, List, NamedTuple, Optional, Tuple, Type,
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Field, Model
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -32,6 +33,29 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def enable_strict_query_budget():
+    with override_settings(QUERY_BUDGET_STRICT=True):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(settings, tmp_path_factory):
+    settings.CACHES = {
+        "default": {
+            **settings.CACHES["default"],
+            "LOCATION": tmp_path_factory.mktemp("cache"),
+        }
+    }
+    cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def private_metrics_dir(settings, tmp_path_factory):
+    settings.METRICS_DIR = tmp_path_factory.mktemp("metrics")
+
+
 class SafeImportFromContextManager:
     def __init__(
         self,
@@ -356,6 +380,7 @@ def cleanup(request):
                 filename.endswith(".jpg")
                 or filename.endswith(".gif")
                 or filename.endswith(".png")
+                or filename.endswith(".webp")
             ):
                 file_path = os.path.join(root, filename)
                 if os.path.getmtime(file_path) >= start_time:
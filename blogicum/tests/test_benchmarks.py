@@ -0,0 +1,37 @@
+import pytest
+
+from blog.management.commands.benchmark import (benchmark_cases,
+                                                find_regressions, measure,
+                                                run_benchmarks)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_benchmark_cases_cover_hot_paths(post_with_published_location):
+    cases = benchmark_cases(post_with_published_location)
+    for name in (
+        "queryset.feed",
+        "render.post_card",
+        "form.post",
+        "form.comment",
+        "reverse.post_detail",
+        "request.index",
+        "request.post_detail",
+    ):
+        assert name in cases, f"Убедитесь, что есть замер `{name}`."
+    results = run_benchmarks(cases, repeat=1, min_time=0)
+    assert set(results) == set(cases)
+    assert all(value > 0 for value in results.values())
+
+
+def test_measure_repeats_until_min_time():
+    calls = []
+    measure(lambda: calls.append(1), repeat=2, min_time=0.001)
+    assert len(calls) > 2
+
+
+def test_find_regressions_uses_threshold():
+    baseline = {"fast": 100, "slow": 100, "new_in_baseline": 5}
+    results = {"fast": 110, "slow": 130, "missing": 1}
+    assert list(find_regressions(results, baseline, 20)) == ["slow"]
+    assert find_regressions(results, baseline, 50) == {}
@@ -0,0 +1,76 @@
+import pytest
+from django.core.management import call_command
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_comment_views(
+    user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Первый"})
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Второй"})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        "Убедитесь, что при создании комментария увеличивается счётчик"
+        " комментариев публикации."
+    )
+
+    comment = post.comments.first()
+    user_client.post(f"/posts/{post.id}/delete_comment/{comment.id}")
+    post.refresh_from_db()
+    assert post.comment_count == 1, (
+        "Убедитесь, что при удалении комментария уменьшается счётчик"
+        " комментариев публикации."
+    )
+
+
+def test_comment_count_follows_author_deletion(
+    another_user, another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    for text in ("Первый", "Второй"):
+        another_user_client.post(
+            f"/posts/{post.id}/comment/", data={"text": text}
+        )
+    another_user.delete()
+    post.refresh_from_db()
+    assert post.comment_count == post.comments.count() == 0, (
+        "Убедитесь, что при удалении пользователя счётчики комментариев"
+        " прокомментированных им публикаций уменьшаются."
+    )
+
+
+def test_comment_count_follows_comment_moves(
+    mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    other = mixer.blend("blog.Post", author=user)
+    mixer.blend("blog.Comment", post=post, author=user)
+    comment = Comment.objects.get()
+    comment.post = other
+    comment.save()
+    assert list(
+        Post.objects.filter(pk__in=[post.pk, other.pk])
+        .order_by("pk")
+        .values_list("comment_count", flat=True)
+    ) == [0, 1], (
+        "Убедитесь, что счётчики комментариев меняются при любом"
+        " сохранении комментария, не только через страницы блога."
+    )
+
+
+def test_recount_comments_repairs_drift(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend("blog.Comment", post=post)
+    Post.objects.filter(pk=post.pk).update(comment_count=0)
+
+    call_command("recount_comments", "--dry-run")
+    post.refresh_from_db()
+    assert post.comment_count == 0
+
+    call_command("recount_comments")
+    post.refresh_from_db()
+    assert post.comment_count == 3
@@ -0,0 +1,52 @@
+import pytest
+from bs4 import BeautifulSoup
+
+from blog.constants import COMMENT_LIST_LIMIT
+
+pytestmark = [pytest.mark.django_db]
+
+
+def comment_ids(html):
+    soup = BeautifulSoup(html, features="html.parser")
+    return [
+        int(anchor["name"].split("_")[1])
+        for anchor in soup.select('a[name^="comment_"]')
+    ]
+
+
+def test_comments_load_more(mixer, client, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(COMMENT_LIST_LIMIT * 2 + 3).blend(
+        "blog.Comment", post=post
+    )
+    expected_ids = [
+        comment.id
+        for comment in sorted(comments, key=lambda c: (c.created_at, c.id))
+    ]
+
+    detail = client.get(f"/posts/{post.id}/")
+    seen_ids = comment_ids(detail.content.decode())
+    assert len(seen_ids) == COMMENT_LIST_LIMIT
+    next_url = BeautifulSoup(
+        detail.content.decode(), features="html.parser"
+    ).select_one("#load-more-comments")["data-url"]
+    while next_url:
+        data = client.get(next_url).json()
+        seen_ids.extend(comment_ids(data["html"]))
+        next_url = data["next"]
+    assert seen_ids == expected_ids, (
+        "Убедитесь, что подгрузка комментариев выводит каждый комментарий"
+        " ровно один раз в порядке их создания."
+    )
+
+
+def test_comments_endpoint_hides_invisible_post(
+    mixer, client, user, published_category
+):
+    post = mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=False,
+    )
+    assert client.get(f"/posts/{post.id}/comments/").status_code == 404
@@ -0,0 +1,115 @@
+import time
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from django.utils.http import http_date
+
+pytestmark = [pytest.mark.django_db]
+
+URLS = ["/", "/posts/{id}/", "/category/{slug}/"]
+
+
+def page_url(url, post):
+    return url.format(id=post.id, slug=post.category.slug)
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_not_modified_without_queries(
+    client, django_assert_num_queries, post_with_published_location, url
+):
+    url = page_url(url, post_with_published_location)
+    response = client.get(url)
+    assert response.has_header("ETag") and response.has_header(
+        "Last-Modified"
+    ), "Убедитесь, что страница отдаёт заголовки ETag и Last-Modified."
+    with django_assert_num_queries(0):
+        not_modified = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert not_modified.status_code == 304, (
+        "Убедитесь, что при совпадении ETag возвращается ответ 304."
+    )
+    assert not_modified["ETag"] == response["ETag"]
+    since = client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+    assert since.status_code == 304, (
+        "Убедитесь, что If-Modified-Since тоже позволяет ответить 304."
+    )
+
+
+@pytest.mark.parametrize("url", URLS)
+def test_validators_change_on_post_change(
+    client, post_with_published_location, url
+):
+    post = post_with_published_location
+    url = page_url(url, post)
+    etag = client.get(url)["ETag"]
+    post.title = "Обновлённое название"
+    post.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        "Убедитесь, что после изменения публикации страница отдаётся заново."
+    )
+    assert response["ETag"] != etag
+
+
+def test_detail_validators_change_on_comment(
+    client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    etag = client.get(url)["ETag"]
+    mixer.blend("blog.Comment", post=post, author=user)
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 200, (
+        "Убедитесь, что новый комментарий меняет ETag страницы публикации."
+    )
+
+
+def test_feed_validators_change_when_scheduled_post_goes_public(
+    client, monkeypatch, mixer, user, published_category
+):
+    now = timezone.now()
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=now + timedelta(seconds=30),
+    )
+    first = client.get("/")
+    monkeypatch.setattr(timezone, "now", lambda: now + timedelta(minutes=1))
+    response = client.get("/", HTTP_IF_NONE_MATCH=first["ETag"])
+    assert response.status_code == 200 and response["ETag"] != first["ETag"], (
+        "Убедитесь, что выход отложенной публикации меняет ETag ленты."
+    )
+    response = client.get("/", HTTP_IF_MODIFIED_SINCE=first["Last-Modified"])
+    assert response.status_code == 200, (
+        "Убедитесь, что выход отложенной публикации меняет Last-Modified."
+    )
+
+
+def test_authenticated_pages_not_conditional(
+    user_client, post_with_published_location
+):
+    response = user_client.get("/")
+    assert not response.has_header("ETag"), (
+        "Убедитесь, что страницы авторизованных пользователей не получают"
+        " ETag: они зависят от пользователя."
+    )
+
+
+@pytest.mark.parametrize("url", ["/posts/99999/", "/category/nope/"])
+def test_missing_page_not_answered_with_304(client, url):
+    future = http_date(time.time() + 3600)
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=future)
+    assert response.status_code == 404, (
+        "Убедитесь, что 304 не отдаётся для страниц, которых нет."
+    )
+
+
+def test_first_request_still_conditional(client, post_with_published_location):
+    url = f"/posts/{post_with_published_location.id}/"
+    future = http_date(time.time() + 3600)
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=future)
+    assert response.status_code == 304, (
+        "Убедитесь, что после отрисовки страницы условный запрос"
+        " получает 304."
+    )
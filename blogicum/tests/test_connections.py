@@ -0,0 +1,37 @@
+from blog.connections import check_persistent_connections, connection_stats
+
+
+class FakeConnection:
+    def __init__(self, usable=True, open=True, in_atomic_block=False):
+        self.connection = object() if open else None
+        self.in_atomic_block = in_atomic_block
+        self.usable = usable
+
+    def is_usable(self):
+        return self.usable
+
+    def close(self):
+        self.connection = None
+
+
+def test_broken_persistent_connection_discarded():
+    before = connection_stats()
+    healthy, broken, closed = (
+        FakeConnection(),
+        FakeConnection(usable=False),
+        FakeConnection(open=False),
+    )
+    check_persistent_connections([healthy, broken, closed])
+    after = connection_stats()
+    assert healthy.connection is not None
+    assert broken.connection is None
+    assert after["reused"] == before["reused"] + 1
+    assert after["discarded"] == before["discarded"] + 1
+
+
+def test_connection_in_transaction_left_alone():
+    before = connection_stats()
+    busy = FakeConnection(usable=False, in_atomic_block=True)
+    check_persistent_connections([busy])
+    assert busy.connection is not None
+    assert connection_stats() == before
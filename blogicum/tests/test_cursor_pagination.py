@@ -0,0 +1,67 @@
+import pytest
+from conftest import N_PER_PAGE
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def visible_post_ids(PostModel):
+    return list(
+        PostModel.objects.filter(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=timezone.now(),
+        )
+        .order_by("-pub_date", "-id")
+        .values_list("id", flat=True)
+    )
+
+
+def test_cursor_pagination_walks_feed(
+    client, PostModel, many_posts_with_published_locations
+):
+    expected_ids = visible_post_ids(PostModel)
+    assert len(expected_ids) > N_PER_PAGE
+
+    seen_ids = []
+    url = "/"
+    with CaptureQueriesContext(connection) as queries:
+        while url:
+            page_obj = client.get(url).context["page_obj"]
+            seen_ids.extend(post.id for post in page_obj)
+            url = page_obj.has_next() and f"/?after={page_obj.next_cursor}"
+    assert seen_ids == expected_ids, (
+        "Убедитесь, что переход по курсорам `after` выводит все публикации"
+        " ленты ровно один раз и в правильном порядке."
+    )
+    sql = " ".join(query["sql"] for query in queries.captured_queries)
+    assert "COUNT(*)" not in sql and "OFFSET" not in sql, (
+        "Убедитесь, что курсорная пагинация не выполняет запросы с подсчётом"
+        " количества строк и смещением OFFSET."
+    )
+
+
+def test_cursor_pagination_goes_back(
+    client, PostModel, many_posts_with_published_locations
+):
+    first_page = client.get("/").context["page_obj"]
+    second_page = client.get(f"/?after={first_page.next_cursor}").context[
+        "page_obj"
+    ]
+    assert second_page.has_previous()
+    back_page = client.get(
+        f"/?before={second_page.previous_cursor}"
+    ).context["page_obj"]
+    assert [post.id for post in back_page] == [
+        post.id for post in first_page
+    ]
+    assert not back_page.has_previous()
+
+
+@pytest.mark.parametrize(
+    "cursor", ["garbage!", "WzFd", "bnVsbA", "W251bGwsbnVsbF0"]
+)
+def test_cursor_pagination_rejects_bad_cursor(client, cursor):
+    assert client.get(f"/?after={cursor}").status_code == 404
@@ -0,0 +1,28 @@
+import pytest
+
+from blog.constants import COMMENT_LIST_LIMIT
+
+pytestmark = [pytest.mark.django_db]
+
+# Session, user, post with its relations and one page of comments.
+DETAIL_QUERY_BUDGET = 4
+
+
+@pytest.mark.parametrize("n_comments", [0, 3, COMMENT_LIST_LIMIT + 5])
+def test_detail_page_query_budget(
+    mixer,
+    user_client,
+    django_assert_num_queries,
+    post_with_published_location,
+    n_comments,
+):
+    post = post_with_published_location
+    mixer.cycle(n_comments).blend("blog.Comment", post=post)
+    with django_assert_num_queries(DETAIL_QUERY_BUDGET):
+        response = user_client.get(f"/posts/{post.id}/")
+    assert len(response.context["comments"]) == min(
+        n_comments, COMMENT_LIST_LIMIT
+    ), (
+        "Убедитесь, что на странице публикации выводится не больше одной"
+        " страницы комментариев."
+    )
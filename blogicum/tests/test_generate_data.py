@@ -0,0 +1,53 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db.models import Count
+from django.utils import timezone
+
+from blog.models import Category, Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def generate(*args):
+    out = StringIO()
+    call_command(
+        "generate_data",
+        "--users", "5",
+        "--categories", "4",
+        "--locations", "3",
+        "--posts", "120",
+        "--batch-size", "50",
+        "--scheduled", "0.2",
+        "--unpublished-categories", "0.5",
+        *args,
+        stdout=out,
+    )
+    return json.loads(out.getvalue()[out.getvalue().index("{"):])
+
+
+def test_generate_data_counts():
+    report = generate()
+    assert report["created"]["post"] == Post.objects.count() == 120
+    assert report["created"]["comment"] == Comment.objects.count()
+    assert Post.objects.filter(pub_date__gt=timezone.now()).exists(), (
+        "Убедитесь, что генерируются отложенные публикации."
+    )
+    assert Category.objects.filter(is_published=False).exists()
+
+
+def test_generate_data_keeps_comment_count():
+    generate()
+    posts = Post.objects.annotate(real=Count("comments"))
+    assert all(post.comment_count == post.real for post in posts), (
+        "Убедитесь, что comment_count совпадает с числом комментариев."
+    )
+
+
+def test_generate_data_can_run_twice():
+    generate()
+    generate()
+    assert Post.objects.count() == 240
+    assert Category.objects.count() == 8
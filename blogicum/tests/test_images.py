@@ -0,0 +1,143 @@
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.template import Context, Template
+from PIL import Image
+
+from blog.caching import render_post_card
+from blog.images import variant_widths
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def run_jobs():
+    call_command("run_jobs", "--once", "--workers", "0", stdout=StringIO())
+
+
+def render_post_image(post):
+    return Template("{% load blog_tags %}{% post_image post %}").render(
+        Context({"post": post})
+    )
+
+
+@pytest.fixture
+def large_image_post(mixer, user, published_category):
+    img_io = BytesIO()
+    Image.new("RGB", (1500, 1000), color=(73, 109, 137)).save(
+        img_io, format="JPEG"
+    )
+    return mixer.blend(
+        "blog.Post",
+        is_published=True,
+        category=published_category,
+        author=user,
+        image=ImageFile(img_io, name="large_image.jpg"),
+    )
+
+
+def test_variant_widths_never_upscale():
+    assert variant_widths(100) == [100]
+    assert variant_widths(700) == [320, 640, 700]
+    assert variant_widths(5000) == [320, 640, 960, 1280]
+
+
+def test_placeholder_until_variants_ready(large_image_post):
+    assert large_image_post.image_variants == {
+        "source": large_image_post.image.name,
+        "pending": True,
+        "width": 1500,
+        "height": 1000,
+    }
+    html = render_post_image(large_image_post)
+    assert 'alt="Фото обрабатывается"' in html, (
+        "Убедитесь, что до готовности копий показывается заглушка."
+    )
+    assert 'width="1500" height="1000"' in html
+
+
+def test_variants_generated_by_job(large_image_post):
+    run_jobs()
+    large_image_post.refresh_from_db()
+    variants = large_image_post.image_variants
+    assert variants["source"] == large_image_post.image.name
+    assert (variants["width"], variants["height"]) == (1500, 1000)
+    assert {
+        (variant["format"], variant["width"], variant["height"])
+        for variant in variants["variants"]
+    } == {
+        (image_format, width, round(width * 2 / 3))
+        for image_format in ("webp", "jpeg")
+        for width in (320, 640, 960, 1280)
+    }, "Убедитесь, что фото уменьшается до всех заданных ширин."
+    storage = large_image_post.image.storage
+    for variant in variants["variants"]:
+        with storage.open(variant["name"]) as file:
+            assert Image.open(file).width == variant["width"]
+
+
+def test_post_card_has_srcset(user_client, large_image_post):
+    run_jobs()
+    content = user_client.get("/").content.decode()
+    assert '<source type="image/webp"' in content
+    assert "1280w" in content and 'sizes="' in content
+    assert 'width="1280" height="853"' in content, (
+        "Убедитесь, что у картинки указаны ширина и высота."
+    )
+
+
+def test_card_updated_when_job_cache_is_not_shared(
+    settings, large_image_post
+):
+    post = Post.objects.get(pk=large_image_post.pk)
+    assert "Фото обрабатывается" in render_post_card(post)
+    renderer_caches = settings.CACHES
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    run_jobs()
+    settings.CACHES = renderer_caches
+    post.refresh_from_db()
+    assert '<source type="image/webp"' in render_post_card(post), (
+        "Убедитесь, что карточка с заглушкой не остаётся в кэше после"
+        " готовности копий, даже если задача сбросила другой кэш."
+    )
+
+
+def test_old_images_shown_as_is_until_queued(
+    django_assert_num_queries, post_with_published_location
+):
+    Post.objects.filter(pk=post_with_published_location.pk).update(
+        image_variants={}
+    )
+    post = Post.objects.get(pk=post_with_published_location.pk)
+    with django_assert_num_queries(0):
+        html = render_post_image(post)
+    assert f'src="{post.image.url}"' in html, (
+        "Убедитесь, что фото без копий показывается как есть, а показ"
+        " страницы ничего не пишет в базу."
+    )
+    call_command(
+        "run_jobs", "--once", "--workers", "0", "--stale-images",
+        stdout=StringIO(),
+    )
+    post.refresh_from_db()
+    assert "100w" in render_post_image(post)
+    assert post.image_variants["source"] == post.image.name, (
+        "Убедитесь, что run_jobs --stale-images создаёт копии старых фото."
+    )
+
+
+def test_unreadable_image_falls_back_to_original(
+    post_with_published_location
+):
+    post = post_with_published_location
+    post.image.storage.delete(post.image.name)
+    run_jobs()
+    post.refresh_from_db()
+    assert f'src="{post.image.url}"' in render_post_image(post)
+    assert post.image_variants == {
+        "source": post.image.name, "variants": []
+    }
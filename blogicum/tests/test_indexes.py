@@ -0,0 +1,68 @@
+import pytest
+from django.db import connection
+from django.test import RequestFactory
+
+from blog.views import CategoryListView, IndexListView, PostListView
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite", reason="План запроса SQLite."
+    ),
+]
+
+
+def view_queryset(view_class, user, **kwargs):
+    request = RequestFactory().get("/")
+    request.user = user
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset().order_by(*view.cursor_ordering)
+
+
+def assert_uses_index(queryset, index_name):
+    plan = queryset[:11].explain()
+    assert f"USING INDEX {index_name}" in plan, (
+        f"Убедитесь, что запрос использует индекс `{index_name}`:\n{plan}"
+    )
+    assert "TEMP B-TREE" not in plan, (
+        f"Убедитесь, что запрос не сортирует строки без индекса:\n{plan}"
+    )
+
+
+def test_feed_uses_index(user, many_posts_with_published_locations):
+    assert_uses_index(
+        view_queryset(IndexListView, user), "post_published_pub_date_idx"
+    )
+
+
+def test_category_uses_index(
+    user, published_category, many_posts_with_published_locations
+):
+    assert_uses_index(
+        view_queryset(
+            CategoryListView, user, category_slug=published_category.slug
+        ),
+        "post_category_pub_date_idx",
+    )
+
+
+@pytest.mark.parametrize("as_owner", [True, False])
+def test_profile_uses_index(
+    user, another_user, many_posts_with_published_locations, as_owner
+):
+    assert_uses_index(
+        view_queryset(
+            PostListView,
+            user if as_owner else another_user,
+            username=user.username,
+        ),
+        "post_author_pub_date_idx",
+    )
+
+
+def test_comments_use_index(post_with_published_location):
+    assert_uses_index(
+        post_with_published_location.comments.select_related("author"),
+        "comment_post_created_at_idx",
+    )
@@ -0,0 +1,75 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.constants import JOB_MAX_ATTEMPTS, JOB_RETRY_DELAY
+from blog.jobs import claim_jobs, enqueue, execute, finish, job_handler
+from blog.models import Job
+
+pytestmark = [pytest.mark.django_db]
+
+calls = []
+
+
+@job_handler("test_append")
+def append(value):
+    calls.append(value)
+
+
+@job_handler("test_fail")
+def fail():
+    raise RuntimeError("сбой")
+
+
+def run_due(token="worker"):
+    for job in claim_jobs(10, token):
+        finish(job, execute(job.kind, job.payload))
+
+
+def test_job_runs_and_is_removed():
+    calls.clear()
+    enqueue("test_append", value=1)
+    enqueue("test_append", value=1)
+    assert Job.objects.count() == 1, (
+        "Убедитесь, что одинаковые задачи не дублируются в очереди."
+    )
+    run_due()
+    assert calls == [1]
+    assert not Job.objects.exists()
+
+
+def test_failed_job_retried_with_backoff():
+    enqueue("test_fail")
+    run_due()
+    job = Job.objects.get()
+    assert job.status == Job.PENDING and job.attempts == 1
+    assert "RuntimeError: сбой" in job.last_error
+    assert job.run_after > timezone.now() + timedelta(
+        seconds=JOB_RETRY_DELAY - 1
+    )
+    run_due()
+    assert Job.objects.get().attempts == 1, (
+        "Убедитесь, что повтор выполняется не раньше run_after."
+    )
+
+
+def test_job_fails_after_max_attempts():
+    enqueue("test_fail")
+    for _ in range(JOB_MAX_ATTEMPTS):
+        Job.objects.update(run_after=timezone.now())
+        run_due()
+    assert Job.objects.get().status == Job.FAILED
+
+
+def test_claimed_job_not_taken_twice():
+    enqueue("test_append", value=2)
+    assert len(claim_jobs(10, "first")) == 1
+    assert claim_jobs(10, "second") == []
+
+
+def test_stale_lock_released():
+    enqueue("test_append", value=3)
+    claim_jobs(10, "dead")
+    Job.objects.update(locked_at=timezone.now() - timedelta(days=1))
+    assert len(claim_jobs(10, "alive")) == 1
@@ -0,0 +1,81 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from blog.management.commands import loadtest
+from blog.models import Comment, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+
+def run_loadtest(*args):
+    out = StringIO()
+    call_command(
+        "loadtest",
+        "--users", "3",
+        "--posts", "6",
+        "--comments", "10",
+        "--concurrency", "1",
+        "--host", "testserver",
+        *args,
+        stdout=out,
+    )
+    return json.loads(out.getvalue())
+
+
+def test_loadtest_reports_every_route():
+    report = run_loadtest("--requests", "60")
+    assert report["requests"] == 60
+    assert set(report["routes"]) == {
+        "index", "category", "profile", "detail", "comment", "edit"
+    }
+    for route, stats in report["routes"].items():
+        assert stats["errors"] == 0, (
+            f"Убедитесь, что запросы маршрута `{route}` выполняются"
+            " без ошибок."
+        )
+        assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert stats["queries_max"] is not None
+
+
+def test_loadtest_seed_keeps_comment_count():
+    run_loadtest("--requests", "20", "--mix", "comment=1")
+    for post in Post.objects.all():
+        assert post.comment_count == Comment.objects.filter(
+            post=post
+        ).count(), "Убедитесь, что счётчик комментариев не расходится."
+    run_loadtest("--requests", "1", "--mix", "index=1")
+    assert Post.objects.count() == 6, (
+        "Убедитесь, что повторный запуск не создаёт лишних публикаций."
+    )
+
+
+def test_loadtest_rejects_bad_mix():
+    with pytest.raises(CommandError):
+        run_loadtest("--mix", "index=1,unknown=2")
+
+
+def test_loadtest_rerun_gives_every_user_a_post():
+    run_loadtest("--requests", "1", "--mix", "index=1")
+    run_loadtest("--users", "10", "--posts", "10", "--requests", "1")
+    users = User.objects.filter(username__startswith="loadtest-")
+    assert users.count() == 10
+    assert not users.filter(posts=None).exists(), (
+        "Убедитесь, что у каждого пользователя нагрузочного теста есть"
+        " публикация для правки."
+    )
+
+
+def test_loadtest_counts_worker_exceptions(monkeypatch):
+    def fail(*args):
+        raise RuntimeError("сбой транспорта")
+
+    monkeypatch.setattr(loadtest.InProcessTransport, "request", fail)
+    report = run_loadtest("--requests", "5", "--mix", "index=1")
+    assert report["requests"] == 5
+    assert report["routes"]["index"]["errors"] == 5, (
+        "Убедитесь, что исключения в потоках считаются ошибками, а не"
+        " теряются."
+    )
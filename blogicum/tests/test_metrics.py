@@ -0,0 +1,118 @@
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.test import Client
+
+from blog import metrics
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def metrics_dir(settings):
+    return settings.METRICS_DIR
+
+
+def sample(text, line_start):
+    for line in text.splitlines():
+        if line.startswith(line_start):
+            return float(line.rsplit(" ", 1)[1])
+    return 0.0
+
+
+def test_metrics_count_requests_and_queries(
+        user_client, post_with_published_location
+):
+    before = user_client.get("/metrics").content.decode()
+    user_client.get("/")
+    text = user_client.get("/metrics").content.decode()
+    requests_line = (
+        'blog_http_requests_total{method="GET",route="blog:index",'
+        'status="200"}'
+    )
+    assert sample(text, requests_line) == sample(before, requests_line) + 1, (
+        "Убедитесь, что /metrics считает запросы по имени маршрута."
+    )
+    assert "# TYPE blog_http_request_duration_seconds histogram" in text
+    assert (
+        'blog_http_request_duration_seconds_bucket{route="blog:index",'
+        'le="+Inf"}'
+    ) in text
+    assert sample(text, 'blog_db_queries_total{route="blog:index"}') > 0
+    assert 'blog_cache_requests_total{cache="post_card"' in text
+
+
+def test_metrics_count_writes(user_client, post_with_published_location):
+    before = metrics.render_metrics()
+    user_client.post(
+        f"/posts/{post_with_published_location.id}/comment/",
+        {"text": "Комментарий"},
+    )
+    after = metrics.render_metrics()
+    created = 'blog_writes_total{action="created",model="comment"}'
+    assert sample(after, created) == sample(before, created) + 1
+
+
+def test_metrics_sum_worker_files(metrics_dir):
+    metrics.flush(force=True)
+    (metrics_dir / f"{os.getppid()}.json").write_text(json.dumps({
+        "counters": [[
+            "blog_http_requests_total",
+            [["method", "GET"], ["route", "other"], ["status", "200"]],
+            3,
+        ]],
+        "histograms": [],
+    }))
+    text = metrics.render_metrics()
+    assert sample(
+        text,
+        'blog_http_requests_total{method="GET",route="other",status="200"}',
+    ) == 3, "Убедитесь, что метрики всех процессов суммируются."
+
+
+def test_metrics_keep_counts_of_exited_workers(metrics_dir):
+    exited = metrics_dir / "999999.json"
+    exited.write_text(json.dumps({
+        "counters": [[
+            "blog_http_requests_total",
+            [["method", "GET"], ["route", "exited"], ["status", "200"]],
+            2,
+        ]],
+        "histograms": [[
+            "blog_http_request_duration_seconds",
+            [["route", "exited"]],
+            [1] * len(metrics.DURATION_BUCKETS),
+            0.001,
+            1,
+        ]],
+    }))
+    line = 'blog_http_requests_total{method="GET",route="exited",status="200"}'
+    assert sample(metrics.render_metrics(), line) == 2
+    assert not exited.exists(), (
+        "Убедитесь, что файлы завершившихся процессов удаляются."
+    )
+    text = metrics.render_metrics()
+    assert sample(text, line) == 2, (
+        "Убедитесь, что счётчики завершившихся процессов не пропадают."
+    )
+    assert 'blog_http_request_duration_seconds_count{route="exited"}' in text
+
+
+def test_metrics_closed_for_remote_hosts():
+    response = Client(REMOTE_ADDR="10.0.0.1").get("/metrics")
+    assert response.status_code == 403
+
+
+@pytest.mark.parametrize("force", [True, False])
+def test_metrics_flush_from_many_threads(metrics_dir, settings, force):
+    settings.METRICS_FLUSH_SECONDS = 0
+    with ThreadPoolExecutor(8) as executor:
+        results = list(
+            executor.map(lambda _: metrics.flush(force), range(400))
+        )
+    assert results == [None] * 400, (
+        "Убедитесь, что одновременная запись метрик из потоков не падает."
+    )
+    assert json.loads((metrics_dir / f"{os.getpid()}.json").read_text())
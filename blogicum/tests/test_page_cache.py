@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from blog.caching import cache_stats, get_stamped
+from blog.checks import check_shared_cache
+from blog.constants import PAGE_CACHE_TIMEOUT
+from blog.views import IndexListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_anonymous_feed_served_from_cache(
+    client, django_assert_num_queries, post_with_published_location
+):
+    client.get("/")
+    with django_assert_num_queries(0):
+        response = client.get("/")
+    assert post_with_published_location.title in response.content.decode()
+
+
+def test_authenticated_feed_not_cached(
+    user_client, post_with_published_location
+):
+    user_client.get("/")
+    before = cache_stats()
+    user_client.get("/")
+    assert cache_stats()["page_hits"] == before["page_hits"], (
+        "Убедитесь, что страницы авторизованных пользователей не кэшируются."
+    )
+
+
+@pytest.mark.parametrize("url", ["/", "/posts/{id}/", "/category/{slug}/"])
+def test_page_cache_invalidated_on_post_change(
+    client, post_with_published_location, url
+):
+    post = post_with_published_location
+    url = url.format(id=post.id, slug=post.category.slug)
+    client.get(url)
+    post.title = "Обновлённое название"
+    post.save()
+    assert "Обновлённое название" in client.get(url).content.decode()
+
+
+def test_detail_cache_invalidated_on_category_unpublish(
+    client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f"/posts/{post.id}/"
+    assert client.get(url).status_code == 200
+    post.category.is_published = False
+    post.category.save()
+    assert client.get(url).status_code == 404, (
+        "Убедитесь, что снятие категории с публикации сбрасывает кэш"
+        " страницы публикации."
+    )
+
+
+def test_feed_cache_expires_at_scheduled_post(
+    mixer, user, published_category
+):
+    mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(seconds=30),
+    )
+    timeout = IndexListView().get_page_cache_timeout()
+    assert 0 < timeout <= 30 < PAGE_CACHE_TIMEOUT, (
+        "Убедитесь, что кэш ленты истекает к моменту выхода отложенной"
+        " публикации."
+    )
+
+
+def test_process_local_cache_reported(settings):
+    assert check_shared_cache(None) == [], (
+        "Убедитесь, что кэш по умолчанию общий для всех процессов."
+    )
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    assert [warning.id for warning in check_shared_cache(None)] == [
+        "blog.W001"
+    ], "Убедитесь, что кэш в памяти процесса вызывает предупреждение."
+
+
+def test_pages_work_without_cache(
+    client, settings, post_with_published_location
+):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+    }
+    assert client.get("/").status_code == 200
+
+
+def test_missing_stamp_stored_without_add(monkeypatch):
+    def add(*args, **kwargs):
+        raise AssertionError("add() is not atomic in the file cache")
+
+    monkeypatch.setattr(cache, "add", add)
+    stamp, _ = get_stamped("blog:test", [("post", 1)])
+    assert get_stamped("blog:test", [("post", 1)])[0] == stamp, (
+        "Убедитесь, что недостающая версия сохраняется в кэше."
+    )
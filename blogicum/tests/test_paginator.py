@@ -0,0 +1,25 @@
+import pytest
+from bs4 import BeautifulSoup
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+
+
+@pytest.mark.parametrize(
+    "number, expected",
+    [
+        (1, ["1", ">>", "Последняя"]),
+        (2500, ["Первая", "<<", "2500", ">>", "Последняя"]),
+        (5000, ["Первая", "<<", "5000"]),
+    ],
+)
+def test_paginator_renders_constant_window(number, expected):
+    page_obj = Paginator(range(50_000), 10).page(number)
+    html = render_to_string("includes/paginator.html", {"page_obj": page_obj})
+    items = [
+        item.get_text(strip=True)
+        for item in BeautifulSoup(html, "html.parser").select(".page-item")
+    ]
+    assert items == expected, (
+        "Убедитесь, что пагинатор выводит ссылки на первую, предыдущую,"
+        " следующую и последнюю страницы, а не ссылку на каждую страницу."
+    )
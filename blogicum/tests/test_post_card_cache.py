@@ -0,0 +1,57 @@
+import pytest
+from blog.caching import cache_stats
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_served_from_cache(
+    user_client, post_with_published_location
+):
+    user_client.get("/")
+    before = cache_stats()
+    user_client.get("/")
+    after = cache_stats()
+    assert after["post_card_hits"] == before["post_card_hits"] + 1, (
+        "Убедитесь, что при повторном показе ленты карточка публикации"
+        " берётся из кэша."
+    )
+    assert after["post_card_misses"] == before["post_card_misses"]
+
+
+@pytest.mark.parametrize(
+    "change", ["post", "category", "location", "author"]
+)
+def test_post_card_invalidated_on_change(
+    user_client, post_with_published_location, change
+):
+    post = post_with_published_location
+    user_client.get("/")
+    marker = "Обновлённое название"
+    if change == "post":
+        post.title = marker
+        post.save()
+    elif change == "category":
+        post.category.title = marker
+        post.category.save()
+    elif change == "location":
+        post.location.name = marker
+        post.location.save()
+    else:
+        post.author.username = "updated_author"
+        post.author.save()
+        marker = "@updated_author"
+    content = user_client.get("/").content.decode("utf-8")
+    assert marker in content, (
+        "Убедитесь, что карточка публикации обновляется после изменения"
+        " связанных с ней данных."
+    )
+
+
+def test_post_card_invalidated_on_comment(
+    user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get("/")
+    user_client.post(f"/posts/{post.id}/comment/", data={"text": "Новый"})
+    content = user_client.get("/").content.decode("utf-8")
+    assert "Комментарии (1)" in content
@@ -0,0 +1,35 @@
+import logging
+
+import pytest
+from django.test import override_settings
+
+from blog.middleware import QueryBudgetExceeded
+from blog.views import IndexListView
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_server_timing_reports_queries(user_client, post_with_published_location):
+    response = user_client.get("/")
+    assert 'desc="3 queries"' in response["Server-Timing"], (
+        "Убедитесь, что в заголовке Server-Timing передаётся число запросов"
+        " к базе данных."
+    )
+
+
+def test_strict_mode_raises_over_budget(
+    monkeypatch, user_client, post_with_published_location
+):
+    monkeypatch.setattr(IndexListView, "query_budget", 1)
+    with pytest.raises(QueryBudgetExceeded):
+        user_client.get("/")
+
+
+def test_over_budget_logged(
+    monkeypatch, caplog, user_client, post_with_published_location
+):
+    monkeypatch.setattr(IndexListView, "query_budget", 1)
+    with override_settings(QUERY_BUDGET_STRICT=False):
+        with caplog.at_level(logging.WARNING, logger="blog.middleware"):
+            assert user_client.get("/").status_code == 200
+    assert "made 3 queries, budget is 1" in caplog.text
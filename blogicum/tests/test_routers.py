@@ -0,0 +1,123 @@
+import pytest
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from blog import routers
+from blog.caching import cache_stats, render_post_card
+from blog.middleware import PRIMARY_PIN_COOKIE, ReplicaRoutingMiddleware
+from blog.models import Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+REPLICAS = ["replica_down", "replica_up"]
+
+
+@pytest.fixture
+def replicas(tmp_path):
+    paths = {
+        "replica_down": tmp_path / "missing" / "db.sqlite3",
+        "replica_up": tmp_path / "replica.sqlite3",
+    }
+    for alias, path in paths.items():
+        connections.databases[alias] = {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": str(path),
+        }
+    routers._down_until.clear()
+    with override_settings(DATABASE_REPLICAS=REPLICAS):
+        yield
+    for alias in paths:
+        if hasattr(connections._connections, alias):
+            connections[alias].close()
+            delattr(connections._connections, alias)
+        del connections.databases[alias]
+
+
+@pytest.fixture
+def replica_reads(replicas):
+    token = routers.allow_replica_reads(True)
+    yield
+    routers.reset_replica_reads(token)
+
+
+def test_reads_fail_over_to_live_replica(replica_reads):
+    router = routers.ReplicaRouter()
+    for _ in range(len(REPLICAS) * 2):
+        assert router.db_for_read(Post) == "replica_up", (
+            "Убедитесь, что чтение идёт с доступной реплики, а недоступная"
+            " пропускается."
+        )
+    assert Post.objects.all().db == "replica_up"
+
+
+def test_replica_checked_once_per_request(replicas, monkeypatch):
+    checks = []
+    monkeypatch.setattr(
+        routers, "_pick_replica", lambda: checks.append(1) or "replica_up"
+    )
+    router = routers.ReplicaRouter()
+    for _ in range(2):
+        token = routers.allow_replica_reads(True)
+        for _ in range(3):
+            router.db_for_read(Post)
+        routers.reset_replica_reads(token)
+    assert len(checks) == 2, (
+        "Убедитесь, что реплика выбирается и проверяется один раз за запрос."
+    )
+
+
+def test_writes_and_other_apps_use_default(replica_reads):
+    router = routers.ReplicaRouter()
+    assert router.db_for_write(Post) == "default"
+    assert router.db_for_read(User) is None
+    assert router.allow_migrate("replica_up", "blog") is False
+
+
+def test_reads_use_primary_outside_safe_requests(replicas):
+    assert Post.objects.all().db == "default"
+
+
+def test_middleware_pins_writer_to_primary(replicas):
+    seen = []
+
+    def view(request):
+        seen.append(routers._replicas_allowed.get())
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(view)
+    factory = RequestFactory()
+
+    response = middleware(factory.post("/posts/1/comment/"))
+    assert PRIMARY_PIN_COOKIE in response.cookies
+
+    middleware(factory.get("/"))
+    pinned = factory.get("/")
+    pinned.COOKIES[PRIMARY_PIN_COOKIE] = "1"
+    middleware(pinned)
+    assert seen == [False, True, False], (
+        "Убедитесь, что после записи пользователь читает с основной базы."
+    )
+
+
+def test_anonymous_pages_filled_from_primary(
+    client, replicas, post_with_published_location
+):
+    # replica_up has no tables: any read routed to it would fail.
+    post = post_with_published_location
+    for url in ("/", f"/posts/{post.id}/", f"/category/{post.category.slug}/"):
+        assert client.get(url).status_code == 200, (
+            "Убедитесь, что кэшируемые страницы строятся по основной базе."
+        )
+
+
+def test_post_card_from_replica_not_cached(post_with_published_location):
+    post = post_with_published_location
+    post._state.db = "replica_up"
+    with override_settings(DATABASE_REPLICAS=REPLICAS):
+        before = cache_stats()["post_card_misses"]
+        render_post_card(post)
+        render_post_card(post)
+    assert cache_stats()["post_card_misses"] == before + 2, (
+        "Убедитесь, что карточки, прочитанные с реплики, не кэшируются."
+    )
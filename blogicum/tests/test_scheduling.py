@@ -0,0 +1,69 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+
+from blog.caching import cache_stats
+from blog.scheduling import (next_visibility_change,
+                             seconds_until_visibility_change)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=5),
+    )
+
+
+def test_next_visibility_change_is_cached(
+    django_assert_num_queries, scheduled_post
+):
+    assert next_visibility_change() == scheduled_post.pub_date
+    with django_assert_num_queries(0):
+        assert next_visibility_change() == scheduled_post.pub_date
+    assert 0 < seconds_until_visibility_change() <= 5 * 60
+
+
+def test_next_visibility_change_follows_new_posts(
+    mixer, scheduled_post
+):
+    assert next_visibility_change() == scheduled_post.pub_date
+    sooner = mixer.blend(
+        "blog.Post",
+        author=scheduled_post.author,
+        category=scheduled_post.category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(minutes=1),
+    )
+    assert next_visibility_change() == sooner.pub_date
+
+
+def test_next_visibility_change_ignores_past(scheduled_post):
+    later = scheduled_post.pub_date + timedelta(seconds=1)
+    assert next_visibility_change(later) is None
+
+
+def test_warm_scheduled_posts_fills_page_cache(
+    client, post_with_published_location
+):
+    call_command(
+        "warm_scheduled_posts", "--once", "--host", "testserver"
+    )
+    before = cache_stats()
+    client.get("/")
+    assert cache_stats()["page_hits"] == before["page_hits"] + 1
+
+
+def test_warm_scheduled_posts_needs_shared_cache(settings):
+    settings.CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+    with pytest.raises(CommandError):
+        call_command("warm_scheduled_posts", "--once")
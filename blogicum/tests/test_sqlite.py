@@ -0,0 +1,32 @@
+import pytest
+from django.db import connection, connections
+
+from blog.middleware import QueryCounter
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != "sqlite", reason="Настройки SQLite."
+    ),
+]
+
+
+@pytest.mark.parametrize(
+    ("pragma", "expected"),
+    [("synchronous", 1), ("temp_store", 2), ("busy_timeout", 5000)],
+)
+def test_sqlite_pragmas_applied(pragma, expected):
+    with connection.cursor() as cursor:
+        cursor.execute(f"PRAGMA {pragma}")
+        assert cursor.fetchone()[0] == expected
+
+
+def test_pragmas_not_counted_as_request_queries():
+    counter = QueryCounter()
+    fresh = connections.create_connection("default")
+    with fresh.execute_wrapper(counter):
+        fresh.ensure_connection()
+    fresh.close()
+    assert counter.count == 0, (
+        "Убедитесь, что настройка соединения не попадает в счётчик запросов."
+    )
@@ -0,0 +1,156 @@
+import os
+import time
+from io import BytesIO, StringIO
+
+import pytest
+from django.core.files.base import ContentFile
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+from blog.models import Post, StoredFile
+from blog.storage import (IMMUTABLE_CACHE_CONTROL, is_content_addressed,
+                          serve_media)
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def media_root(tmp_path, settings):
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+def photo(color, name="photo.jpg"):
+    buffer = BytesIO()
+    Image.new("RGB", (40, 30), color=color).save(buffer, format="JPEG")
+    return ImageFile(buffer, name=name)
+
+
+@pytest.fixture
+def make_post(mixer, user, published_category):
+    def make(image):
+        return mixer.blend(
+            "blog.Post",
+            author=user,
+            category=published_category,
+            is_published=True,
+            image=image,
+        )
+    return make
+
+
+def references(name):
+    return StoredFile.objects.get(name=name).references
+
+
+def collect(*args):
+    out = StringIO()
+    call_command("collect_media", "--grace-hours", "0", *args, stdout=out)
+    return out.getvalue()
+
+
+def test_same_content_stored_once(make_post, media_root):
+    first = make_post(photo((1, 2, 3), "a.jpg"))
+    second = make_post(photo((1, 2, 3), "B.JPG"))
+    assert first.image.name == second.image.name, (
+        "Убедитесь, что одинаковые файлы хранятся один раз."
+    )
+    assert is_content_addressed(first.image.name)
+    assert first.image.name.startswith("post_photo/")
+    assert references(first.image.name) == 2
+    assert len([p for p in media_root.rglob("*") if p.is_file()]) == 1
+
+
+def test_references_follow_edits_and_deletes(make_post):
+    post = make_post(photo((1, 2, 3)))
+    old_name = post.image.name
+    post.image = photo((9, 9, 9))
+    post.save()
+    assert references(old_name) == 0
+    assert references(post.image.name) == 1
+    post.delete()
+    assert references(post.image.name) == 0
+
+
+def test_edit_tracks_references_without_reading_post(make_post):
+    post = Post.objects.get(pk=make_post(photo((1, 2, 3))).pk)
+    old_name = post.image.name
+    post.image = photo((9, 9, 9))
+    with CaptureQueriesContext(connection) as queries:
+        post.save()
+    assert not [
+        query for query in queries.captured_queries
+        if query["sql"].startswith('SELECT "blog_post"."id"')
+        or query["sql"].startswith('SELECT "blog_post"."image"')
+    ], "Убедитесь, что сохранение публикации не перечитывает её фото."
+    assert references(old_name) == 0
+    assert references(post.image.name) == 1
+
+
+def test_collect_media_removes_orphans(make_post, media_root):
+    kept = make_post(photo((1, 2, 3)))
+    edited = make_post(photo((4, 5, 6)))
+    orphan = edited.image.name
+    edited.image = photo((7, 8, 9))
+    edited.save()
+    stray = kept.image.storage.save("post_photo/stray.jpg", ContentFile(b"x"))
+
+    assert orphan in collect("--dry-run")
+    assert (media_root / orphan).exists()
+
+    collect()
+    assert not (media_root / orphan).exists(), (
+        "Убедитесь, что сборщик удаляет файлы без ссылок."
+    )
+    assert not (media_root / stray).exists()
+    assert (media_root / kept.image.name).exists()
+    assert (media_root / edited.image.name).exists()
+    assert not StoredFile.objects.filter(name=orphan).exists()
+
+
+def test_collect_media_skips_other_media(media_root):
+    other = media_root / "avatars" / "face.jpg"
+    other.parent.mkdir()
+    other.write_bytes(b"x")
+    assert "face.jpg" not in collect()
+    assert other.exists(), (
+        "Убедитесь, что сборщик не трогает файлы вне каталога фото."
+    )
+
+
+def test_collect_media_keeps_variants(make_post, media_root):
+    post = make_post(photo((1, 2, 3)))
+    call_command("run_jobs", "--once", "--workers", "0", stdout=StringIO())
+    post.refresh_from_db()
+    collect()
+    for variant in post.image_variants["variants"]:
+        assert (media_root / variant["name"]).exists()
+    Post.objects.filter(pk=post.pk).delete()
+    collect()
+    assert not [p for p in media_root.rglob("*") if p.is_file()]
+
+
+def test_reupload_refreshes_orphan_mtime(make_post, media_root):
+    post = make_post(photo((7, 8, 9)))
+    path = media_root / post.image.name
+    post.delete()
+    day_ago = time.time() - 2 * 24 * 60 * 60
+    os.utime(path, (day_ago, day_ago))
+    make_post(photo((7, 8, 9)))
+    assert path.stat().st_mtime > day_ago, (
+        "Убедитесь, что повторная загрузка продлевает жизнь файла."
+    )
+    out = StringIO()
+    call_command("collect_media", "--dry-run", stdout=out)
+    assert post.image.name not in out.getvalue()
+
+
+def test_media_served_immutable(rf, make_post):
+    post = make_post(photo((1, 2, 3)))
+    response = serve_media(rf.get(post.image.url), post.image.name)
+    assert response["Cache-Control"] == IMMUTABLE_CACHE_CONTROL, (
+        "Убедитесь, что файлы по хешу отдаются с immutable-кэшированием."
+    )
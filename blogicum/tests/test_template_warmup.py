@@ -0,0 +1,31 @@
+import pytest
+from django.template import engines
+
+from blog.management.commands.benchmark import compare_template_loaders
+from blog.template_warmup import project_templates, warm_templates
+
+
+def cached_loader():
+    loader = engines["django"].engine.template_loaders[0]
+    assert loader.__class__.__module__ == "django.template.loaders.cached", (
+        "Убедитесь, что шаблоны загружаются кэширующим загрузчиком."
+    )
+    return loader
+
+
+def test_warm_templates_compiles_project_templates():
+    loader = cached_loader()
+    loader.reset()
+    names = project_templates(engines["django"].engine.dirs)
+    assert "includes/post_card.html" in names
+    assert warm_templates() == len(names)
+    assert set(names) <= set(loader.get_template_cache), (
+        "Убедитесь, что прогрев компилирует все шаблоны из templates/."
+    )
+
+
+@pytest.mark.django_db
+def test_compare_template_loaders_reports_pages(post_with_published_location):
+    results = compare_template_loaders(post_with_published_location, 1)
+    assert set(results["index"]) == {"uncached_ms", "cached_ms"}
+    cached_loader()
@@ -0,0 +1,34 @@
+import pytest
+from django.test import Client
+
+from blog.timing import percentile
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_server_timing_has_phases(user_client, post_with_published_location):
+    header = user_client.get("/")["Server-Timing"]
+    for phase in ("db", "middleware", "view", "template", "total"):
+        assert f"{phase};dur=" in header, (
+            f"Убедитесь, что в заголовке Server-Timing есть фаза `{phase}`."
+        )
+
+
+def test_timings_endpoint_for_staff_only(mixer, user_client):
+    user_client.get("/")
+    assert user_client.get("/debug/timings/").status_code == 403
+
+    staff = Client()
+    staff.force_login(mixer.blend("auth.User", is_staff=True))
+    summary = staff.get("/debug/timings/").json()
+    assert summary["blog:index"]["total"]["count"] >= 1
+    assert set(summary["blog:index"]["total"]) == {
+        "count", "p50", "p95", "p99"
+    }
+
+
+def test_percentile_nearest_rank():
+    ordered = list(range(1, 101))
+    assert percentile(ordered, 0.5) == 50
+    assert percentile(ordered, 0.99) == 99
+    assert percentile([7], 0.95) == 7
@@ -0,0 +1,129 @@
+import logging
+import os
+from io import BytesIO
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client
+from django.urls import reverse
+from PIL import Image
+
+from blog.models import Post
+from blog.uploads import header_size, is_image_header
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def media_root(settings, tmp_path):
+    settings.MEDIA_ROOT = tmp_path
+
+
+def image_bytes(size=(40, 30), image_format="PNG", mode="RGB", **params):
+    buffer = BytesIO()
+    pixels = os.urandom(size[0] * size[1] * len(mode))
+    Image.frombytes(mode, size, pixels).save(buffer, image_format, **params)
+    return buffer.getvalue()
+
+
+def post_data(published_category, image):
+    return {
+        "title": "Загрузка",
+        "text": "Текст",
+        "pub_date": "2020-01-01 00:00",
+        "category": published_category.pk,
+        "is_published": True,
+        "image": image,
+    }
+
+
+def test_header_parsing():
+    for image_format, params in (
+        ("PNG", {}),
+        ("JPEG", {}),
+        ("GIF", {}),
+        ("WEBP", {}),
+        ("WEBP", {"lossless": True}),
+        ("WEBP", {"mode": "RGBA"}),
+    ):
+        data = image_bytes(image_format=image_format, **params)
+        assert is_image_header(data[:64]), (
+            f"Убедитесь, что формат {image_format} распознаётся по сигнатуре."
+        )
+        assert header_size(data[:1024]) == (40, 30), (
+            "Убедитесь, что размеры читаются из заголовка изображения."
+        )
+    assert not is_image_header(b"RIFF\0\0\0\0WAVEfmt "), (
+        "Убедитесь, что RIFF-файлы, не являющиеся WebP, отклоняются."
+    )
+
+
+def test_valid_upload_logged(caplog, user_client, published_category):
+    url = reverse("blog:create_post")
+    image = SimpleUploadedFile("photo.png", image_bytes(), "image/png")
+    with caplog.at_level(logging.INFO, logger="blog.uploads"):
+        response = user_client.post(url, post_data(published_category, image))
+    assert response.status_code == 302, (
+        "Убедитесь, что публикация с корректным фото создаётся."
+    )
+    assert Post.objects.get(title="Загрузка").image, (
+        "Убедитесь, что загруженное фото сохраняется в публикации."
+    )
+    assert "МБ/с), 40×30" in caplog.text, (
+        "Убедитесь, что скорость загрузки и размеры фото пишутся в лог."
+    )
+
+
+@pytest.mark.parametrize(
+    "setting, value, content, message",
+    [
+        (None, None, b"MZ\x90\0" * 100, "в формате JPEG, PNG, GIF или WebP"),
+        ("POST_IMAGE_MAX_SIZE", 1024, None, "не должен превышать 1,0"),
+        ("POST_IMAGE_MAX_PIXELS", 100, None, "слишком большое"),
+    ],
+    ids=["format", "size", "pixels"],
+)
+def test_rejected_upload(
+    settings, user_client, published_category, setting, value, content,
+    message,
+):
+    if setting:
+        setattr(settings, setting, value)
+    content = content or image_bytes((400, 300))
+    image = SimpleUploadedFile("photo.png", content, "image/png")
+    response = user_client.post(
+        reverse("blog:create_post"), post_data(published_category, image)
+    )
+    assert response.status_code == 200, (
+        "Убедитесь, что при отклонённом фото форма показывается снова."
+    )
+    assert message in response.context["form"].errors["image"][0], (
+        "Убедитесь, что причина отклонения фото видна в форме."
+    )
+    assert not Post.objects.filter(title="Загрузка").exists(), (
+        "Убедитесь, что публикация с отклонённым фото не создаётся."
+    )
+
+
+def test_edit_rejects_upload(user_client, post_with_published_location):
+    post = post_with_published_location
+    image = SimpleUploadedFile("photo.png", b"not an image", "image/png")
+    response = user_client.post(
+        reverse("blog:edit_post", args=[post.pk]),
+        post_data(post.category, image),
+    )
+    assert "image" in response.context["form"].errors, (
+        "Убедитесь, что фото проверяется и при редактировании публикации."
+    )
+
+
+def test_csrf_still_enforced(user, published_category):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    image = SimpleUploadedFile("photo.png", image_bytes(), "image/png")
+    response = client.post(
+        reverse("blog:create_post"), post_data(published_category, image)
+    )
+    assert response.status_code == 403, (
+        "Убедитесь, что страница создания публикации проверяет CSRF-токен."
+    )
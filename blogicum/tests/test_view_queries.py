@@ -0,0 +1,41 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize(
+    ("url", "expected_queries"),
+    [
+        # Session and user are loaded on every authenticated request.
+        ("/profile/{author}/", 4),
+        ("/profile/{another}/", 4),
+        ("/category/{slug}/", 4),
+        # The edit form also loads location and category choices.
+        ("/posts/{post}/edit/", 5),
+        ("/posts/{post}/delete/", 4),
+        ("/posts/{post}/edit_comment/{comment}", 3),
+        ("/posts/{post}/delete_comment/{comment}", 3),
+    ],
+)
+def test_view_query_count(
+    mixer,
+    user,
+    another_user,
+    user_client,
+    django_assert_num_queries,
+    post_with_published_location,
+    url,
+    expected_queries,
+):
+    post = post_with_published_location
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    url = url.format(
+        author=user.username,
+        another=another_user.username,
+        slug=post.category.slug,
+        post=post.id,
+        comment=comment.id,
+    )
+    with django_assert_num_queries(expected_queries):
+        response = user_client.get(url)
+    assert response.status_code == 200